@@ -0,0 +1,160 @@
+import time
+import math
+import os
+import functools
+import cipher_texts
+from cipher_decryption import (
+    MODEL_DIR,
+    Caesar,
+    ColTrans,
+    Foursquare,
+    MonoSub,
+    Playfair,
+    encode,
+    english_quadgram_fitness,
+    english_quadgram_model,
+    letters
+)
+
+CORONA_TEXTS = {
+    name: getattr(cipher_texts.ChallengeCorona, name)
+    for name in vars(cipher_texts.ChallengeCorona)
+    if name.startswith("encrypted_text")
+}
+
+MONOSUB_TEXTS = {
+    name: letters(text).lower() for name, text in (
+        ("2018 3B", cipher_texts.Challenge2018.encrypted_text_3B),
+        ("2018 4A", cipher_texts.Challenge2018.encrypted_text_4A),
+        ("2019 3A", cipher_texts.Challenge2019.encrypted_text_3A)
+    )
+}
+COLTRANS_TEXTS = {
+    "2004 3B": (cipher_texts.Challenge2004.encrypted_text_3B, 9, ["0", "1"]),
+    "2018 6B": (cipher_texts.Challenge2018.encrypted_text_6B, 5, []),
+    "Corona 7B": (Caesar(
+        cipher_texts.ChallengeCorona.encrypted_text_7B, shift=16, forced=True
+    ).encipher(), 7, [])
+}
+
+BATCHED = ("genetic", "beam")
+
+dict_quadgrams = dict()
+
+
+def dict_quadgram_fitness(text: str) -> float:
+    """
+        The original quadgram scorer, one dict lookup per position,
+        kept as the reference the NumPy model is measured against.
+    """
+    if not dict_quadgrams:
+        with open(os.path.join(MODEL_DIR, "english_quadgrams.txt")) as f:
+            for line in f:
+                quadgram, count = line.split(" ")
+                dict_quadgrams[quadgram] = int(count)
+        total = sum(dict_quadgrams.values())
+        for quadgram, count in dict_quadgrams.items():
+            dict_quadgrams[quadgram] = math.log10(count / total)
+    fitness = 0
+    text = letters(text).upper()
+    for index in range(len(text) - 3):
+        fitness += dict_quadgrams.get(text[index:index + 4], -10)
+    return fitness
+
+
+def rate(function, argument, count=200) -> float:
+    """Return how many calls of function(argument) run per second."""
+    function(argument)
+    start = time.perf_counter()
+    for _ in range(count):
+        function(argument)
+    return count / (time.perf_counter() - start)
+
+
+def fitness_benchmark():
+    """
+        Compare the dict reference scorer with string and encoded
+        quadgram scoring on the Corona texts.
+    """
+    model = english_quadgram_model()
+    print("text                 letters     dict/s   string/s  encoded/s")
+    for name, text in CORONA_TEXTS.items():
+        encoded = encode(text)
+        print("{:20} {:7} {:10.0f} {:10.0f} {:10.0f}".format(
+            name,
+            len(encoded),
+            rate(dict_quadgram_fitness, text),
+            rate(english_quadgram_fitness, text),
+            rate(model.score, encoded)
+        ))
+
+
+def search_benchmark(seeds=range(3), workers=1):
+    """
+        Compare annealing with parallel tempering on the Test Playfair
+        and Foursquare samples. A run counts as solved when its
+        fitness reaches the solver's english_target.
+    """
+    samples = [
+        ("playfair", Playfair, cipher_texts.Test.playfair_encrypted),
+        ("foursquare", Foursquare, cipher_texts.Test.foursquare_encrypted)
+    ]
+    print("cipher       search   solved  seconds/run")
+    for name, cipher, text in samples:
+        solver = cipher(text, workers=workers)
+        for search in (solver.anneal, solver.temper):
+            solved, seconds = 0, 0
+            for seed in seeds:
+                start = time.perf_counter()
+                solved += search(seed=seed).fitness >= solver.target
+                seconds += time.perf_counter() - start
+            print("{:12} {:8} {:3}/{:<3} {:10.1f}".format(
+                name, search.__name__, solved, len(seeds),
+                seconds / len(seeds)
+            ))
+
+
+def engine_benchmark(seeds=range(3)):
+    """
+        Compare the optimisers of MonoSub (climb, tabu, genetic) and
+        ColTrans (anneal, tabu, genetic, beam) on Challenge texts: runs
+        reaching the solver's english_target, seconds per run and
+        fitness evaluations per run in the final stage. Genetic and
+        beam runs score keys in batches, outside the fitness cache,
+        so their evaluations are not counted.
+    """
+    runs = list()
+    for name, text in MONOSUB_TEXTS.items():
+        for search in ("climb", "tabu", "genetic"):
+            runs.append((name, "monosub", search, functools.partial(
+                MonoSub, text, search=search
+            )))
+    for name, (text, length, keep) in COLTRANS_TEXTS.items():
+        for search in ("anneal", "tabu", "genetic", "beam"):
+            runs.append((name, "coltrans", search, functools.partial(
+                ColTrans, text, guessed_length=length, keep=keep,
+                search=search
+            )))
+    print("text       cipher    search  solved  seconds/run  evaluations/run")
+    for name, cipher, search, solver_of in runs:
+        solved, seconds, evaluations = 0, 0, 0
+        for seed in seeds:
+            solver = solver_of(seed=seed)
+            start = time.perf_counter()
+            key = solver.best_key
+            seconds += time.perf_counter() - start
+            plain = solver.encipher(key=key)
+            solved += english_quadgram_fitness(plain) >= solver.target
+            if search not in BATCHED:
+                evaluations += solver.fitness_cache.stats.misses
+        print("{:10} {:9} {:7} {:2}/{:<3} {:12.2f} {:>16}".format(
+            name, cipher, search, solved, len(seeds),
+            seconds / len(seeds), "-" if search in BATCHED
+            else "{:.0f}".format(evaluations / len(seeds))
+        ))
+
+
+if __name__ == "__main__":
+    fitness_benchmark()
+    search_benchmark()
+    engine_benchmark()
@@ -3,6 +3,14 @@ import math
 import collections
 import itertools
 import functools
+import contextlib
+import csv
+import json
+import os
+import pickle
+import statistics
+import multiprocessing
+import threading
 import cipher_texts
 import pdb
 import random
@@ -16,15 +24,33 @@ start_time = time.time()
 
 
 def match(original: str, formatted: str) -> str:
-    formatted = list(letters(formatted).lower())
-    original = list(original)
-    for index, value in enumerate(formatted):
-        if not original[index].isalpha() and formatted[index].isalpha():
-            formatted.insert(index, original[index])
-        elif original[index].isupper() and formatted[index].isalpha():
-            formatted[index] = formatted[index].upper()
-    result = "".join(formatted)
-    return result
+    """Give the letters of formatted the spacing and case of original."""
+    return CipherText.of(original).layout.apply(formatted)
+
+
+class Layout:
+    """The spacing, punctuation and case of a text, to re-apply later."""
+
+    def __init__(self, text: str):
+        self.gaps = list()
+        self.upper = list()
+        gap = list()
+        for char in text:
+            if char.isalpha():
+                self.gaps.append("".join(gap))
+                self.upper.append(char.isupper())
+                gap = list()
+            else:
+                gap.append(char)
+
+    def apply(self, formatted: str) -> str:
+        """Lay out the letters of formatted in one linear pass."""
+        stream = letters(formatted).lower()
+        laid_out = "".join(
+            gap + (char.upper() if upper else char)
+            for gap, upper, char in zip(self.gaps, self.upper, stream)
+        )
+        return laid_out + stream[len(self.gaps):]
 
 
 def letters(string: str, keep: list=[]) -> str:
@@ -34,6 +60,60 @@ def letters(string: str, keep: list=[]) -> str:
         if character.isalpha() or character in keep)
 
 
+class CipherText(str):
+    """
+        A ciphertext that strips and encodes its letters only once,
+        caching the views that solvers keep asking for.
+    """
+
+    @classmethod
+    def of(cls, text: str):
+        """Wrap text, reusing it if it is already a CipherText."""
+        return text if isinstance(text, cls) else cls(text)
+
+    @functools.cached_property
+    def stripped(self) -> str:
+        """Return the lower case letters of the text."""
+        return letters(self).lower()
+
+    @functools.cached_property
+    def encoded(self) -> np.ndarray:
+        """Return the a-z letters of the text as uint8 codes."""
+        return encode(self)
+
+    @functools.cached_property
+    def layout(self) -> Layout:
+        """Return the layout template of the text."""
+        return Layout(self)
+
+    @functools.cached_property
+    def _views(self) -> dict:
+        return dict()
+
+    def kept(self, keep: list=[]) -> str:
+        """Return letters(text, keep=keep), cached per keep."""
+        view = ("kept", tuple(keep))
+        if view not in self._views:
+            self._views[view] = letters(self, keep=keep)
+        return self._views[view]
+
+    def statistics(self, periods: range) -> tuple:
+        """Return period_statistics of the text, cached per periods."""
+        view = ("statistics", tuple(periods))
+        if view not in self._views:
+            self._views[view] = period_statistics(self.encoded, periods)
+        return self._views[view]
+
+    def columns(self, period: int) -> tuple:
+        """Return the stripped text split into period columns."""
+        view = ("columns", period)
+        if view not in self._views:
+            self._views[view] = tuple(
+                self.stripped[offset::period] for offset in range(period)
+            )
+        return self._views[view]
+
+
 def mod_inverse(num: int, mod: int) -> int:
     """Return the modular inverse of num modulo mod, if it exists."""
     num = num % mod
@@ -51,13 +131,54 @@ def word_reverse(text: str) -> str:
     )
 
 
-def pad_to_length(string: str, length: int, fillvalue=" "):
-    new_string = string
-    if len(new_string) >= length:
-        return new_string
-    else:
-        new_string += fillvalue
-        return pad_to_length(new_string, length, fillvalue=fillvalue)
+class Transposition:
+    """
+        A transposition of texts of one length, compiled to an index
+        array: the transposed text is text[gather]. Stacked
+        transpositions compose into a single array with then(), and
+        apply() transposes a string or an encoded text in one gather.
+    """
+
+    def __init__(self, gather: np.ndarray):
+        self.gather = np.asarray(gather, dtype=np.intp)
+
+    def __len__(self) -> int:
+        return len(self.gather)
+
+    @classmethod
+    def scytale(cls, length: int, key: int):
+        """
+            Read every skip-th letter, skip = round(length / key),
+            starting from each of the first skip letters in turn.
+        """
+        skip = round(length / key)
+        if not skip:
+            return cls(np.empty(0, dtype=np.intp))
+        return cls(np.argsort(np.arange(length) % skip, kind="stable"))
+
+    @classmethod
+    def columnar(cls, length: int, key: tuple):
+        """
+            Read each block of len(key) letters in key order. A short
+            last block gives only the key positions it has.
+        """
+        key = np.asarray(key, dtype=np.intp)
+        base = length - length % len(key)
+        return cls(np.concatenate((
+            (np.arange(0, base, len(key))[:, None] + key).ravel(),
+            base + key[key < length - base]
+        )))
+
+    def then(self, other):
+        """Return the transposition applying self and then other."""
+        return Transposition(self.gather[other.gather])
+
+    def apply(self, text):
+        """Transpose a string or an array of codes."""
+        if isinstance(text, str):
+            codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            return codes[self.gather].tobytes().decode("utf-32-le")
+        return text[self.gather]
 
 
 def chunked(iterable, chunk_length):
@@ -67,6 +188,22 @@ def chunked(iterable, chunk_length):
     )
 
 
+def square_positions(key: str) -> np.ndarray:
+    """Return the index of each letter a-z in a key square, or -1."""
+    positions = np.full(26, -1, dtype=np.intp)
+    positions[encode(key)] = np.arange(len(key))
+    return positions
+
+
+def changed_places(key, new_key) -> frozenset:
+    """Return the dict keys or sequence positions where two keys differ."""
+    if isinstance(key, dict):
+        return frozenset(char for char in key if key[char] != new_key[char])
+    return frozenset(
+        i for i, (old, new) in enumerate(zip(key, new_key)) if old != new
+    )
+
+
 def keys_nicer(key):
     new_key = dict()
     new_key_ls = list()
@@ -88,31 +225,712 @@ def key_swap_chars(key, char1, char2):
     return keys_nicer(new_key)
 
 
+def order_crossover(key1, key2, rng=random):
+    """
+        Order crossover of two permutation keys: a random slice of key1
+        stays in place and the other places take the remaining elements
+        in the order they come in key2. String keys give a string.
+    """
+    start, end = sorted(rng.sample(range(len(key1) + 1), k=2))
+    kept = key1[start:end]
+    rest = [elem for elem in key2 if elem not in kept]
+    child = rest[:start] + list(kept) + rest[start:]
+    if isinstance(key1, str):
+        return "".join(child)
+    return tuple(child)
+
+
+AnnealState = collections.namedtuple(
+    "AnnealState",
+    ['restart', 'iteration', 'temp', 'fitness', 'best_fitness']
+)
+
+
+class HillClimber:
+    """
+        Hill climbing over keys. In "steepest" mode every neighbour is
+        scored and the fittest taken; in "first" mode the first better
+        neighbour is taken. With shuffle the neighbours are visited in
+        random order. Given restart(key) -> key and an evaluation or
+        time budget (time_limit seconds, or a time.monotonic() deadline),
+        the climber restarts from restart(best key) at each local
+        optimum until the budget runs out or the best key reaches
+        target. Progress goes to report(event, AnnealState).
+        Shuffling and restarts draw from rng, the random module unless
+        a seeded random.Random is given.
+    """
+
+    def __init__(
+        self,
+        fitness,
+        neighbors,
+        mode="steepest",
+        shuffle=False,
+        count=1000,
+        restart=None,
+        max_evaluations=None,
+        time_limit=None,
+        report=None,
+        target=None,
+        rng=None,
+        deadline=None
+    ):
+        if mode not in ("steepest", "first"):
+            raise ValueError("mode must be 'steepest' or 'first'")
+        self.fitness = fitness
+        self.neighbors = neighbors
+        self.mode = mode
+        self.shuffle = shuffle
+        self.count = count
+        self.restart = restart
+        self.max_evaluations = max_evaluations
+        self.time_limit = time_limit
+        self.report = report
+        self.target = target
+        self.rng = random if rng is None else rng
+        self.deadline = deadline
+        self.evaluations = 0
+        self.restarts = 0
+
+    def score(self, key) -> float:
+        self.evaluations += 1
+        return self.fitness(key)
+
+    def exhausted(self) -> bool:
+        """Return whether the evaluation or time budget is spent."""
+        if self.max_evaluations is not None and (
+            self.evaluations >= self.max_evaluations
+        ):
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return self.time_limit is not None and (
+            time.monotonic() - self.start >= self.time_limit
+        )
+
+    def step(self, key, key_fitness):
+        """Return the neighbour to move to and its fitness, or None."""
+        neighbors = self.neighbors(key)
+        if self.shuffle:
+            neighbors = list(neighbors)
+            self.rng.shuffle(neighbors)
+        best = None
+        for child_key in neighbors:
+            child_fitness = self.score(child_key)
+            if child_fitness > key_fitness:
+                best = KeyFit(key=child_key, fitness=child_fitness)
+                if self.mode == "first":
+                    break
+                key_fitness = child_fitness
+            if self.exhausted():
+                break
+        return best
+
+    def climb(self, key) -> tuple:
+        """Climb from key to a local optimum, within count steps."""
+        key_fitness = self.score(key)
+        for iteration in range(self.count):
+            if self.report:
+                self.report("iteration", AnnealState(
+                    self.restarts, iteration, None, key_fitness,
+                    max(key_fitness, self.best_fitness)
+                ))
+            best = self.step(key, key_fitness)
+            if best is None or self.exhausted():
+                if best is not None:
+                    key, key_fitness = best
+                break
+            key, key_fitness = best
+        return KeyFit(key=key, fitness=key_fitness)
+
+    def run(self, initial_key):
+        """Climb from initial_key, restarting while budget remains."""
+        self.start = time.monotonic()
+        self.evaluations = 0
+        self.restarts = 0
+        self.best_key, self.best_fitness = initial_key, -math.inf
+        key = initial_key
+        while True:
+            optimum = self.climb(key)
+            if optimum.fitness > self.best_fitness:
+                self.best_key, self.best_fitness = optimum
+            budget = self.max_evaluations is not None or (
+                self.time_limit is not None or self.deadline is not None
+            )
+            if not (self.restart and budget) or self.exhausted():
+                break
+            if self.target is not None and self.best_fitness >= self.target:
+                break
+            self.restarts += 1
+            if self.report:
+                self.report("restart", AnnealState(
+                    self.restarts, 0, None, None, self.best_fitness
+                ))
+            key = self.restart(self.best_key, self.rng)
+        return self.best_key
+
+
 def hill_climbing(
     initial_key,
     fitness,
     neighbors,
-    count=1000
+    count=1000,
+    mode="steepest",
+    shuffle=False,
+    report=None,
+    rng=None,
+    deadline=None
 ):
-    current_key = initial_key
-    for c in range(count):
-        possible_keys = list()
-        parent_fitness = fitness(current_key)
-        print(parent_fitness)
-        possible_keys.append(KeyFit(key=current_key, fitness=parent_fitness))
-        for child_key in neighbors(current_key):
-            child_fitness = fitness(child_key)
-            possible_keys.append(KeyFit(key=child_key, fitness=child_fitness))
-        best_key = sorted(
-            possible_keys,
-            key=lambda elem: elem.fitness,
-            reverse=True
-        )[0].key
-        if current_key == best_key:
-            break
+    return HillClimber(
+        fitness=fitness,
+        neighbors=neighbors,
+        mode=mode,
+        shuffle=shuffle,
+        count=count,
+        report=report,
+        rng=rng,
+        deadline=deadline
+    ).run(initial_key)
+
+
+class TabuSearch:
+    """
+        Tabu search over keys. Each step scores the candidate moves
+        from the current key, either every key of neighbors(key) or
+        samples keys from new_key(key, rng), and moves to the fittest
+        one that is not tabu, even when it is worse. A move is named by
+        move(key, new_key), by default the places whose value changed
+        (the swapped letters of a MonoSub key, the moved columns of a
+        ColTrans key). The last tenure moves made are tabu unless they
+        lead to a key fitter than the best seen (aspiration). The
+        search ends after count steps, after stale steps without a new
+        best, on stop(), at a time.monotonic() deadline, after
+        max_evaluations or once the best key reaches target.
+    """
+
+    def __init__(
+        self,
+        fitness,
+        neighbors=None,
+        new_key=None,
+        move=changed_places,
+        samples=50,
+        tenure=10,
+        count=1000,
+        stale=200,
+        max_evaluations=None,
+        deadline=None,
+        target=None,
+        report=None,
+        stop=None,
+        rng=None
+    ):
+        if (neighbors is None) == (new_key is None):
+            raise ValueError("give exactly one of neighbors and new_key")
+        self.fitness = fitness
+        self.neighbors = neighbors
+        self.new_key = new_key
+        self.move = move
+        self.samples = samples
+        self.tenure = tenure
+        self.count = count
+        self.stale = stale
+        self.max_evaluations = max_evaluations
+        self.deadline = deadline
+        self.target = target
+        self.report = report
+        self.stop = stop
+        self.rng = random if rng is None else rng
+        self.evaluations = 0
+        self.tabu = collections.OrderedDict()
+
+    def candidates(self, key):
+        if self.neighbors is not None:
+            return self.neighbors(key)
+        return (self.new_key(key, self.rng) for _ in range(self.samples))
+
+    def remember(self, move):
+        """Make move tabu, forgetting the oldest tabu move past tenure."""
+        self.tabu[move] = None
+        self.tabu.move_to_end(move)
+        if len(self.tabu) > self.tenure:
+            self.tabu.popitem(last=False)
+
+    def exhausted(self) -> bool:
+        if self.max_evaluations is not None and (
+            self.evaluations >= self.max_evaluations
+        ):
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return bool(self.stop and self.stop())
+
+    def step(self, key):
+        """Return the fittest admissible neighbour of key, or None."""
+        best = None
+        for child_key in self.candidates(key):
+            child_fitness = self.fitness(child_key)
+            self.evaluations += 1
+            if self.move(key, child_key) in self.tabu and (
+                child_fitness <= self.best_fitness
+            ):
+                continue
+            if best is None or child_fitness > best.fitness:
+                best = KeyFit(key=child_key, fitness=child_fitness)
+        return best
+
+    def run(self, initial_key):
+        """Search from initial_key; return the best key seen."""
+        self.evaluations = 0
+        self.tabu.clear()
+        key = initial_key
+        self.best_key, self.best_fitness = key, self.fitness(key)
+        last_best = 0
+        for iteration in range(self.count):
+            if iteration - last_best >= self.stale or self.exhausted():
+                break
+            if self.target is not None and self.best_fitness >= self.target:
+                break
+            best = self.step(key)
+            if best is None:
+                break
+            self.remember(self.move(key, best.key))
+            key, key_fitness = best
+            if key_fitness > self.best_fitness:
+                self.best_key, self.best_fitness = key, key_fitness
+                last_best = iteration
+            if self.report:
+                self.report("iteration", AnnealState(
+                    0, iteration, None, key_fitness, self.best_fitness
+                ))
+        return self.best_key
+
+
+class GeneticSearch:
+    """
+        Genetic search over permutation keys. A whole generation is
+        scored at once by batch_fitness(keys), which returns an array
+        of fitnesses, so scoring can be a single vectorised NumPy call.
+        Each generation keeps the elite fittest keys and breeds the
+        rest from parents picked by tournament: crossover(key1, key2,
+        rng) combines two parents and new_key(key, rng) then mutates
+        the child with probability mutation. The search ends after
+        generations generations, after stale generations without a new
+        best, on stop(), at a time.monotonic() deadline or once the
+        best key reaches target.
+    """
+
+    def __init__(
+        self,
+        batch_fitness,
+        new_key,
+        crossover=order_crossover,
+        population=200,
+        elite=10,
+        tournament=3,
+        mutation=0.5,
+        generations=500,
+        stale=100,
+        deadline=None,
+        target=None,
+        report=None,
+        stop=None,
+        rng=None
+    ):
+        if not 0 < elite < population:
+            raise ValueError("elite must be between 0 and population")
+        self.batch_fitness = batch_fitness
+        self.new_key = new_key
+        self.crossover = crossover
+        self.population = population
+        self.elite = elite
+        self.tournament = tournament
+        self.mutation = mutation
+        self.generations = generations
+        self.stale = stale
+        self.deadline = deadline
+        self.target = target
+        self.report = report
+        self.stop = stop
+        self.rng = random if rng is None else rng
+        self.evaluations = 0
+
+    def score(self, keys: list) -> np.ndarray:
+        self.evaluations += len(keys)
+        return np.asarray(self.batch_fitness(keys), dtype=np.float64)
+
+    def select(self, keys: list, fitnesses: np.ndarray):
+        """Return the fittest of tournament keys drawn at random."""
+        return keys[max(
+            (self.rng.randrange(len(keys)) for _ in range(self.tournament)),
+            key=lambda index: fitnesses[index]
+        )]
+
+    def breed(self, keys: list, fitnesses: np.ndarray) -> tuple:
+        """Return the next generation's keys and fitnesses."""
+        elite = np.argsort(fitnesses)[::-1][:self.elite]
+        children = list()
+        for _ in range(self.population - self.elite):
+            child = self.crossover(
+                self.select(keys, fitnesses),
+                self.select(keys, fitnesses),
+                self.rng
+            )
+            if self.rng.random() < self.mutation:
+                child = self.new_key(child, self.rng)
+            children.append(child)
+        return (
+            [keys[index] for index in elite] + children,
+            np.concatenate((fitnesses[elite], self.score(children)))
+        )
+
+    def exhausted(self) -> bool:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return True
+        return bool(self.stop and self.stop())
+
+    def run(self, initial_keys):
+        """
+            Evolve from initial_keys, topped up to population with
+            mutants of them; return the best key seen.
+        """
+        self.evaluations = 0
+        keys = list(initial_keys)
+        while len(keys) < self.population:
+            keys.append(self.new_key(
+                initial_keys[self.rng.randrange(len(initial_keys))],
+                self.rng
+            ))
+        fitnesses = self.score(keys)
+        best = int(np.argmax(fitnesses))
+        self.best_key, self.best_fitness = keys[best], fitnesses[best]
+        last_best = 0
+        for generation in range(self.generations):
+            if generation - last_best >= self.stale or self.exhausted():
+                break
+            if self.target is not None and self.best_fitness >= self.target:
+                break
+            keys, fitnesses = self.breed(keys, fitnesses)
+            best = int(np.argmax(fitnesses))
+            if fitnesses[best] > self.best_fitness:
+                self.best_key, self.best_fitness = keys[best], fitnesses[best]
+                last_best = generation
+            if self.report:
+                self.report("iteration", AnnealState(
+                    0, generation, None, float(fitnesses[best]),
+                    float(self.best_fitness)
+                ))
+        self.best_fitness = float(self.best_fitness)
+        return self.best_key
+
+
+def linear_cooling(initial_temp: float, iteration: int, count: int) -> float:
+    """Cool linearly from initial_temp towards 0 over count iterations."""
+    return initial_temp - iteration * initial_temp / count
+
+
+def exponential_cooling(
+    initial_temp: float, iteration: int, count: int, final: float=0.001
+) -> float:
+    """Cool geometrically from initial_temp to final * initial_temp."""
+    return initial_temp * final ** (iteration / count)
+
+
+def reheating_cooling(
+    initial_temp: float,
+    iteration: int,
+    count: int,
+    cycles: int=4,
+    decay: float=0.5
+) -> float:
+    """
+        Cool linearly towards 0 cycles times over count iterations,
+        reheating each time to decay times the previous peak.
+    """
+    length = count / cycles
+    cycle = min(int(iteration // length), cycles - 1)
+    return initial_temp * decay ** cycle * (
+        1 - (iteration - cycle * length) / length
+    )
+
+
+SCHEDULES = {
+    "linear": linear_cooling,
+    "exponential": exponential_cooling,
+    "reheating": reheating_cooling
+}
+
+
+def calibrate_temperature(
+    fitness, new_key, key, acceptance: float=0.25, samples: int=100,
+    rng=random
+):
+    """
+        Return the starting temperature at which the worsening moves
+        among samples random neighbours of key are accepted with mean
+        probability acceptance, or None if no sampled move was worse.
+        The hand-tuned temperatures of the solvers accept about 0.25.
+    """
+    key_fitness = fitness(key)
+    losses = list()
+    for _ in range(samples):
+        dF = fitness(new_key(key, rng)) - key_fitness
+        if dF < 0:
+            losses.append(dF)
+    if not losses:
+        return None
+    losses = np.array(losses)
+    # Mean acceptance rises with temperature: bisect on its logarithm.
+    low, high = math.log(1e-3), math.log(-losses.min() * 1e3)
+    for _ in range(60):
+        middle = (low + high) / 2
+        if np.exp(losses / math.exp(middle)).mean() < acceptance:
+            low = middle
         else:
-            current_key = best_key
-    return current_key
+            high = middle
+    return math.exp(high)
+
+
+class Annealer:
+    """
+        Simulated annealing over keys, caching the current fitness and
+        keeping the best key seen. A chain ending below threshold, or
+        still below stale_fitness after stale iterations, restarts, at
+        most max_restarts times (None for no limit). Restarts begin
+        again from the initial key, or from restart(best key, rng) if
+        given, rather than in the basin that just failed. Progress goes to
+        report(event, AnnealState) instead of being printed, and the
+        run ends early once stop() returns True or a key reaches target.
+        Moves come from new_key(key, rng) and acceptance draws from rng,
+        the random module unless a seeded random.Random is given.
+        Given a checkpoint path, the chain state is saved there every
+        checkpoint_every iterations and resume() carries on from it.
+        Given a time.monotonic() deadline, cooling is stretched or
+        squeezed to fit the time left, restarts continue until the
+        deadline or target whatever max_restarts, and the best key so
+        far is returned then.
+        Given an acceptance rate, initial_temp is calibrated from the
+        starting key to meet it before the run.
+    """
+
+    def __init__(
+        self,
+        fitness,
+        new_key,
+        initial_temp=50,
+        count=10000,
+        max_length=1000,
+        stale=100000,
+        stale_fitness=-100000,
+        threshold=-100000,
+        schedule=linear_cooling,
+        report=None,
+        max_restarts=10,
+        restart=None,
+        stop=None,
+        target=None,
+        rng=None,
+        checkpoint=None,
+        checkpoint_every=1000,
+        deadline=None,
+        acceptance=None
+    ):
+        self.fitness = fitness
+        self.new_key = new_key
+        self.initial_temp = initial_temp
+        self.count = count
+        self.max_length = max_length
+        self.stale = stale
+        self.stale_fitness = stale_fitness
+        self.threshold = threshold
+        self.schedule = schedule
+        self.report = report
+        self.max_restarts = max_restarts
+        self.restart = restart
+        self.stop = stop
+        self.target = target
+        self.rng = random if rng is None else rng
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.deadline = deadline
+        self.acceptance = acceptance
+        self.restarts = 0
+
+    def state(self, iteration: int, temp: float, fitness: float):
+        return AnnealState(
+            self.restarts, iteration, temp, fitness, self.best_fitness
+        )
+
+    def save(self, iteration: int, temp: float, key, fitness, same_key):
+        """Checkpoint the chain as it stands before iteration."""
+        save_checkpoint(self.checkpoint, dict(
+            initial_temp=self.initial_temp,
+            restarts=self.restarts,
+            initial_key=self.initial_key,
+            iteration=iteration,
+            temp=temp,
+            key=key,
+            fitness=fitness,
+            same_key=same_key,
+            best_key=self.best_key,
+            best_fitness=self.best_fitness,
+            rng=self.rng.getstate()
+        ))
+
+    def temperature(self, iteration: int, begun: float) -> float:
+        """
+            Return the temperature at iteration. Against a deadline the
+            schedule follows whichever is further on, the iteration or
+            the share of the chain's time already spent.
+        """
+        if self.deadline is not None:
+            spent = (time.monotonic() - begun) / max(
+                self.deadline - begun, 1e-9
+            )
+            iteration = max(iteration, spent * self.count)
+        return self.schedule(self.initial_temp, iteration, self.count)
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def chain(self, key, resumed=None) -> bool:
+        """
+            Anneal once from key, or from the resumed checkpoint state;
+            return whether a restart is wanted.
+        """
+        if resumed is None:
+            current_key, current_fitness = key, self.fitness(key)
+            same_key, first = 0, 0
+        else:
+            current_key, current_fitness = resumed["key"], resumed["fitness"]
+            same_key, first = resumed["same_key"], resumed["iteration"]
+        begun = time.monotonic()
+        for iteration in range(first, self.count):
+            temp = self.temperature(iteration, begun)
+            if self.checkpoint and iteration % self.checkpoint_every == 0:
+                self.save(
+                    iteration, temp, current_key, current_fitness, same_key
+                )
+            if same_key == self.max_length or self.expired():
+                break
+            if self.stop and self.stop():
+                return False
+            if (
+                iteration == self.stale
+                and self.best_fitness < self.stale_fitness
+            ):
+                return True
+            child_key = self.new_key(current_key, self.rng)
+            child_fitness = self.fitness(child_key)
+            dF = child_fitness - current_fitness
+            if dF > 0 or (
+                dF < 0 and temp > 0
+                and math.e ** (dF/temp) >= self.rng.random()
+            ):
+                current_key, current_fitness = child_key, child_fitness
+                same_key = 0
+            else:
+                same_key += 1
+            if child_fitness > self.best_fitness:
+                self.best_key = child_key
+                self.best_fitness = child_fitness
+                if self.target is not None and child_fitness >= self.target:
+                    return False
+            if self.report:
+                self.report(
+                    "iteration", self.state(iteration, temp, current_fitness)
+                )
+        return self.best_fitness < self.threshold
+
+    def restart_wanted(self, wanted: bool) -> bool:
+        """
+            Against a deadline, restart while time remains unless the
+            run was stopped or reached target; otherwise keep wanted.
+        """
+        if self.deadline is None:
+            return wanted
+        if self.expired() or (self.stop and self.stop()):
+            return False
+        return self.target is None or self.best_fitness < self.target
+
+    def run(self, initial_key, resumed=None):
+        """Anneal from initial_key with restarts; return the best key."""
+        if resumed is None:
+            if self.acceptance is not None:
+                self.initial_temp = calibrate_temperature(
+                    self.fitness, self.new_key, initial_key,
+                    self.acceptance, rng=self.rng
+                ) or self.initial_temp
+            self.initial_key = initial_key
+            self.best_key = initial_key
+            self.best_fitness = self.fitness(initial_key)
+            self.restarts = 0
+        if self.target is not None and self.best_fitness >= self.target:
+            return self.best_key
+        key = initial_key
+        while self.restart_wanted(self.chain(key, resumed)):
+            resumed = None
+            if self.deadline is None and self.max_restarts is not None and (
+                self.restarts >= self.max_restarts
+            ):
+                break
+            self.restarts += 1
+            if self.report:
+                self.report("restart", self.state(0, self.initial_temp, None))
+            if self.restart:
+                key = self.restart(self.best_key, self.rng)
+            else:
+                key = self.initial_key
+        return self.best_key
+
+    def resume(self):
+        """Carry on the run saved at self.checkpoint; return the best key."""
+        resumed = load_checkpoint(self.checkpoint)
+        self.rng.setstate(resumed["rng"])
+        self.initial_temp = resumed["initial_temp"]
+        self.best_key = resumed["best_key"]
+        self.best_fitness = resumed["best_fitness"]
+        self.restarts = resumed["restarts"]
+        self.initial_key = resumed["initial_key"]
+        return self.run(resumed["key"], resumed=resumed)
+
+    def start(self, initial_key, resume=False):
+        """Return resume() if asked to and a checkpoint exists, else run()."""
+        if resume and self.checkpoint and os.path.exists(self.checkpoint):
+            return self.resume()
+        return self.run(initial_key)
+
+
+def budget_deadline(time_limit=None, deadline=None):
+    """
+        Return the time.monotonic() deadline of a run allowed time_limit
+        seconds from now and no later than deadline, or None.
+    """
+    if time_limit is not None:
+        limit = time.monotonic() + time_limit
+        deadline = limit if deadline is None else min(deadline, limit)
+    return deadline
+
+
+def share_deadline(deadline, parts: int):
+    """Return the deadline of the first of parts searches sharing deadline."""
+    if deadline is None:
+        return None
+    now = time.monotonic()
+    return now + max(deadline - now, 0) / parts
+
+
+def save_checkpoint(path: str, state: dict):
+    """Pickle state to path, replacing any old checkpoint atomically."""
+    partial = path + ".partial"
+    with open(partial, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(partial, path)
+
+
+def load_checkpoint(path: str) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
 
 
 def simulated_annealing(
@@ -124,63 +942,379 @@ def simulated_annealing(
     max_length=1000,
     stale=100000,
     stale_fitness=-100000,
-    threshold=-100000
+    threshold=-100000,
+    schedule=linear_cooling,
+    report=None,
+    rng=None,
+    acceptance=None,
+    max_restarts=10,
+    restart=None
+):
+    return Annealer(
+        fitness=fitness,
+        new_key=new_key,
+        initial_temp=initial_temp,
+        count=count,
+        max_length=max_length,
+        stale=stale,
+        stale_fitness=stale_fitness,
+        threshold=threshold,
+        schedule=schedule,
+        report=report,
+        rng=rng,
+        acceptance=acceptance,
+        max_restarts=max_restarts,
+        restart=restart
+    ).run(initial_key)
+
+
+_worker_job = None
+
+
+@contextlib.contextmanager
+def worker_pool(workers: int, job):
+    """
+        Share job with worker processes as _worker_job = (job, stop),
+        stop being an Event set to end the job early, and yield
+        (pool, stop). The pool forks workers processes that inherit
+        the already loaded n-gram model rather than reloading it. pool
+        is None, for the caller to run the job in this process, when
+        workers < 2 or the platform cannot fork. The enclosing job, if
+        pools are nested, is restored on exit.
+    """
+    global _worker_job
+    outer_job = _worker_job
+    if workers < 2 or "fork" not in multiprocessing.get_all_start_methods():
+        stop = threading.Event()
+        _worker_job = (job, stop)
+        try:
+            yield None, stop
+        finally:
+            _worker_job = outer_job
+        return
+    english_quadgram_model()
+    context = multiprocessing.get_context("fork")
+    stop = context.Event()
+    _worker_job = (job, stop)
+    try:
+        with context.Pool(workers) as pool:
+            yield pool, stop
+    finally:
+        _worker_job = outer_job
+
+
+ChainFit = collections.namedtuple("ChainFit", ['key', 'fitness', 'seed'])
+
+
+def new_seed() -> int:
+    """Draw a seed to record for a run from the random module."""
+    return random.randrange(2 ** 32)
+
+
+def _run_chain(seed: int) -> tuple:
+    search, stop = _worker_job
+    key, fitness = search(stop=stop.is_set, seed=seed)
+    return key, fitness, seed
+
+
+def parallel_annealing(
+    search, workers: int, accept=None, chains=None, seed=None
 ):
-    temp_step = initial_temp / count
-    temp = initial_temp
-    current_key = initial_key
-    same_key = 0
-    best_fitness = -100000
-    for c in range(count):
-        if same_key == max_length:
-            break
-        print(c)
-        if c == stale and best_fitness < stale_fitness:
-            print("Stale! Restarting.")
-            return simulated_annealing(
-                initial_key=best_key,
-                fitness=fitness,
-                new_key=new_key,
-                initial_temp=initial_temp,
-                count=count,
-                max_length=max_length,
-                stale=stale,
-                stale_fitness=stale_fitness,
-                threshold=threshold
+    """
+        Run search(stop=..., seed=...) -> KeyFit as independent chains
+        in a worker_pool, chain i with seed + i, one after another if
+        the platform cannot fork. Once a chain reaches accept, the
+        others are told to stop. Return the fittest ChainFit, whose
+        seed replays it.
+    """
+    if seed is None:
+        seed = new_seed()
+    results = list()
+    with worker_pool(workers, search) as (pool, stop):
+        run = pool.imap_unordered if pool else map
+        for key, fitness, chain_seed in run(
+            _run_chain, range(seed, seed + (chains or workers))
+        ):
+            results.append(ChainFit(key, fitness, chain_seed))
+            if accept is not None and fitness >= accept:
+                stop.set()
+    return max(results, key=lambda elem: (elem.fitness, -elem.seed))
+
+
+class Telemetry:
+    """
+        Opt-in solver instrumentation, used as a search's report
+        callback. Counts iterations and accepted and improving moves,
+        keeps every k-th iteration plus all other events (restarts,
+        tempering rounds) in a trace, and times each stage() entered.
+        Chains run in worker processes are not recorded.
+    """
+    TRACE_FIELDS = [
+        'stage', 'event', 'restart', 'iteration',
+        'temp', 'fitness', 'best_fitness'
+    ]
+
+    def __init__(self, every: int=100):
+        self.every = every
+        self.stages = list()
+        self.trace = list()
+        self.current = None
+        self.last_fitness = None
+
+    @staticmethod
+    def new_stage(name: str) -> dict:
+        return dict(
+            name=name, seconds=0.0, iterations=0, accepted=0, improved=0,
+            fitness_calls=None, evaluations=None,
+            events=collections.Counter()
+        )
+
+    def __call__(self, event: str, state):
+        if self.current is None:
+            self.current = self.new_stage("run")
+            self.stages.append(self.current)
+        stage = self.current
+        if event == "iteration":
+            stage["iterations"] += 1
+            last, self.last_fitness = self.last_fitness, state.fitness
+            if last is not None and state.fitness != last:
+                stage["accepted"] += 1
+                stage["improved"] += state.fitness > last
+            if stage["iterations"] % self.every:
+                return
+        else:
+            stage["events"][event] += 1
+            self.last_fitness = None
+        self.trace.append(dict(
+            stage=stage["name"], event=event, **state._asdict()
+        ))
+
+    @contextlib.contextmanager
+    def stage(self, name: str, fitness=None):
+        """
+            Time the enclosed block as stage name. Given a FitnessCache,
+            also record its calls and real evaluations in the block.
+        """
+        record = self.new_stage(name)
+        before = fitness.stats if isinstance(fitness, FitnessCache) else None
+        outer, self.current = self.current, record
+        self.last_fitness = None
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - start
+            if before is not None:
+                after = fitness.stats
+                record["fitness_calls"] = (
+                    after.hits + after.misses - before.hits - before.misses
+                )
+                record["evaluations"] = after.misses - before.misses
+            self.stages.append(record)
+            self.current = outer
+            self.last_fitness = None
+
+    def summary(self) -> list:
+        """Return each stage's counts with derived rates."""
+        rows = list()
+        for stage in self.stages:
+            row = dict(stage, events=dict(stage["events"]))
+            iterations = stage["iterations"]
+            row["acceptance_rate"] = (
+                stage["accepted"] / iterations if iterations else None
             )
-        parent_fitness = fitness(current_key)
-        print("Fitness: ", parent_fitness)
-        child_key = new_key(current_key)
+            row["improvement_rate"] = (
+                stage["improved"] / iterations if iterations else None
+            )
+            row["iterations_per_second"] = (
+                iterations / stage["seconds"] if stage["seconds"] else None
+            )
+            rows.append(row)
+        return rows
+
+    def to_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump({"stages": self.summary(), "trace": self.trace}, f)
+
+    def to_csv(self, path: str):
+        """Write the trace, one sampled state per row."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=Telemetry.TRACE_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.trace)
+
+
+def measure(telemetry, name: str, fitness=None):
+    """Return telemetry.stage(name, fitness), or a no-op without telemetry."""
+    if telemetry is None:
+        return contextlib.nullcontext()
+    return telemetry.stage(name, fitness)
+
+
+def chain_checkpoint(path, seed, base_seed):
+    """
+        Return where the chain run with seed checkpoints: path for the
+        solver's own seed, path.<seed> for the other parallel chains.
+    """
+    if path is None or seed is None or seed == base_seed:
+        return path
+    return "{}.{}".format(path, seed)
+
+
+def best_of_chains(search, workers: int=1, accept=None, seed=None):
+    """
+        Return the ChainFit of one chain, or the best of workers parallel
+        chains; its seed replays the winning chain with search(seed=...).
+    """
+    if workers > 1:
+        return parallel_annealing(search, workers, accept=accept, seed=seed)
+    key, fitness = search(seed=seed)
+    return ChainFit(key, fitness, seed)
+
+
+def geometric_temperatures(low: float, high: float, count: int) -> list:
+    """Return count temperatures spaced geometrically from low to high."""
+    if count == 1:
+        return [low]
+    ratio = (high / low) ** (1 / (count - 1))
+    return [low * ratio ** i for i in range(count)]
+
+
+def metropolis(
+    fitness, new_key, key, key_fitness, temp, steps: int, rng=random
+):
+    """
+        Make steps Metropolis moves from key at the fixed temperature
+        temp, drawing from rng. Return the final key and fitness, the
+        best key and fitness seen, and how many moves were accepted.
+    """
+    best_key, best_fitness = key, key_fitness
+    accepted = 0
+    for _ in range(steps):
+        child_key = new_key(key, rng)
         child_fitness = fitness(child_key)
-        dF = child_fitness - parent_fitness
-        if dF > 0:
-            current_key = child_key
-            same_key = 0
-            print("New key!")
-        elif dF < 0 and math.e ** (dF/temp) >= random.random():
-            current_key = child_key
-            same_key = 0
-            print("New key!")
-        else:
-            same_key += 1
-        temp -= temp_step
-        if child_fitness > best_fitness:
-            best_key = child_key
-            best_fitness = child_fitness
-    if best_fitness < threshold:
-        print("Stale! Restarting.")
-        return simulated_annealing(
-            initial_key=best_key,
-            fitness=fitness,
-            new_key=new_key,
-            initial_temp=initial_temp,
-            count=count,
-            max_length=max_length,
-            stale=stale,
-            stale_fitness=stale_fitness,
-            threshold=threshold
-        )
-    return current_key
+        dF = child_fitness - key_fitness
+        if dF > 0 or (
+            dF < 0 and temp > 0
+            and math.e ** (dF/temp) >= rng.random()
+        ):
+            key, key_fitness = child_key, child_fitness
+            accepted += 1
+            if key_fitness > best_fitness:
+                best_key, best_fitness = key, key_fitness
+    return key, key_fitness, best_key, best_fitness, accepted
+
+
+def _temper_replica(job: tuple) -> tuple:
+    (fitness, new_key), _ = _worker_job
+    key, key_fitness, temp, steps, seed = job
+    return metropolis(
+        fitness, new_key, key, key_fitness, temp, steps, random.Random(seed)
+    )
+
+
+class ParallelTempering:
+    """
+        Replica exchange over keys. One Metropolis chain runs at each
+        of temps (coldest first) for steps moves per round, then
+        neighbouring replicas swap keys with the Metropolis criterion.
+        With workers > 1 the replicas of a round run in a worker_pool.
+        Progress goes to report(event, AnnealState) for the coldest
+        replica. Swaps and the per-replica seeds of each
+        round draw from rng, so a seeded run is the same whatever the
+        number of workers. No round starts after a time.monotonic()
+        deadline.
+    """
+
+    def __init__(
+        self,
+        fitness,
+        new_key,
+        temps,
+        rounds=200,
+        steps=100,
+        workers=1,
+        threshold=None,
+        report=None,
+        stop=None,
+        rng=None,
+        deadline=None
+    ):
+        self.fitness = fitness
+        self.new_key = new_key
+        self.temps = sorted(temps)
+        self.rounds = rounds
+        self.steps = steps
+        self.workers = workers
+        self.threshold = threshold
+        self.report = report
+        self.stop = stop
+        self.rng = random if rng is None else rng
+        self.deadline = deadline
+        self.accepted = [0] * len(self.temps)
+        self.swaps = [0] * (len(self.temps) - 1)
+        self.swap_attempts = [0] * (len(self.temps) - 1)
+
+    def swap(self, keys: list, fitnesses: list, offset: int):
+        """Try to swap the replica pairs starting at offset in place."""
+        temps = self.temps
+        for i in range(offset, len(temps) - 1, 2):
+            j = i + 1
+            self.swap_attempts[i] += 1
+            exponent = (fitnesses[j] - fitnesses[i]) * (
+                1 / temps[i] - 1 / temps[j]
+            )
+            if exponent >= 0 or math.e ** exponent >= self.rng.random():
+                keys[i], keys[j] = keys[j], keys[i]
+                fitnesses[i], fitnesses[j] = fitnesses[j], fitnesses[i]
+                self.swaps[i] += 1
+
+    def rounds_of(self, replicas):
+        """Yield the replica results of each round, ending on stop()."""
+        keys, fitnesses = replicas
+        job = (self.fitness, self.new_key)
+        with worker_pool(self.workers, job) as (pool, _):
+            run = pool.map if pool else lambda f, jobs: list(map(f, jobs))
+            for _ in range(self.rounds):
+                if self.stop and self.stop():
+                    break
+                if self.deadline is not None and (
+                    time.monotonic() >= self.deadline
+                ):
+                    break
+                yield run(_temper_replica, [
+                    (key, key_fitness, temp, self.steps,
+                     self.rng.randrange(2 ** 32))
+                    for key, key_fitness, temp in zip(
+                        keys, fitnesses, self.temps
+                    )
+                ])
+
+    def run(self, initial_keys):
+        """Temper from one initial key per temperature; return the best."""
+        keys = list(initial_keys)
+        fitnesses = [self.fitness(key) for key in keys]
+        best = max(range(len(keys)), key=lambda i: fitnesses[i])
+        self.best_key, self.best_fitness = keys[best], fitnesses[best]
+        for number, results in enumerate(self.rounds_of((keys, fitnesses))):
+            for i, result in enumerate(results):
+                keys[i], fitnesses[i], best_key, best_fitness, accepted = (
+                    result
+                )
+                self.accepted[i] += accepted
+                if best_fitness > self.best_fitness:
+                    self.best_key, self.best_fitness = best_key, best_fitness
+            if self.report:
+                self.report("round", AnnealState(
+                    0, (number + 1) * self.steps, self.temps[0],
+                    fitnesses[0], self.best_fitness
+                ))
+            if self.threshold is not None and (
+                self.best_fitness >= self.threshold
+            ):
+                break
+            self.swap(keys, fitnesses, number % 2)
+        return self.best_key
 # -----------------------
 # -----------------------
 # --Frequency analysis---
@@ -257,6 +1391,56 @@ def english_1gram_chi(text: str) -> float:
     return sum((o - e)**2 / e for o, e in zip(observed, expected))
 
 
+english_1gram_expected = np.array(
+    [english_1gram_expected_dict[char] for char in english_chars]
+)
+
+
+def english_1gram_chi_batch(encoded: np.ndarray) -> np.ndarray:
+    """Return english_1gram_chi of each row of a candidates x letters array."""
+    rows, length = encoded.shape
+    counts = np.bincount(
+        (encoded + ENGLISH_LANG_LEN * np.arange(rows)[:, None]).ravel(),
+        minlength=rows * ENGLISH_LANG_LEN
+    ).reshape(rows, ENGLISH_LANG_LEN)
+    expected = np.ceil(english_1gram_expected * length / 100)
+    return ((counts - expected)**2 / expected).sum(axis=1)
+
+
+PeriodStats = collections.namedtuple(
+    "PeriodStats", ['periods', 'codex', 'chi']
+)
+
+
+def period_statistics(encoded: np.ndarray, periods) -> PeriodStats:
+    """
+        Return the index of coincidence and english chi-squared stat
+        of every column of every candidate period, from one histogram.
+        Row i holds the columns of periods[i], padded with nan.
+    """
+    periods = np.array(list(periods))
+    first_column = np.concatenate(([0], np.cumsum(periods)[:-1]))
+    columns = first_column[:, None] + (
+        np.arange(len(encoded)) % periods[:, None]
+    )
+    counts = np.bincount(
+        (columns * ENGLISH_LANG_LEN + encoded).ravel(),
+        minlength=periods.sum() * ENGLISH_LANG_LEN
+    ).reshape(-1, ENGLISH_LANG_LEN)
+    sizes = counts.sum(axis=1)
+    expected = np.ceil(english_1gram_expected * sizes[:, None] / 100)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        codexes = (counts * (counts - 1)).sum(axis=1) / (sizes * (sizes - 1))
+        chis = ((counts - expected)**2 / expected).sum(axis=1)
+    rows = np.repeat(np.arange(len(periods)), periods)
+    offsets = np.arange(periods.sum()) - np.repeat(first_column, periods)
+    codex_table = np.full((len(periods), periods.max()), np.nan)
+    chi_table = np.full((len(periods), periods.max()), np.nan)
+    codex_table[rows, offsets] = codexes
+    chi_table[rows, offsets] = chis
+    return PeriodStats(periods, codex_table, chi_table)
+
+
 def codex(text: str) -> float:
     """Return the index of coincidence of a text."""
     # text = letters(text).lower()
@@ -269,30 +1453,457 @@ def codex(text: str) -> float:
     )
 
 
-english_4gram_expected_dict = dict()
+QUADGRAM_FLOOR = -10
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-@functools.lru_cache(maxsize=128)
-def english_quadgram_fitness(text: str) -> float:
-    """Return the fitness of a text, based on quadgram count."""
-    if not english_4gram_expected_dict:
-        with open("english_quadgrams.txt") as f:
-            total = 0
+# The 0-25 index of each ASCII letter code, in either case.
+LETTER_INDEX = np.zeros(128, dtype=np.intp)
+LETTER_INDEX[ord("A"):ord("Z") + 1] = np.arange(ENGLISH_LANG_LEN)
+LETTER_INDEX[ord("a"):ord("z") + 1] = np.arange(ENGLISH_LANG_LEN)
+
+
+def encode(text: str) -> np.ndarray:
+    """Return the a-z letters of a text as integers from 0 to 25."""
+    raw = np.frombuffer(
+        text.upper().encode("ascii", "ignore"), dtype=np.uint8
+    )
+    return raw[(raw >= ord("A")) & (raw <= ord("Z"))] - ord("A")
+
+
+def ngram_indices(encoded: np.ndarray, n: int) -> np.ndarray:
+    """Return the base-26 index of every n-gram along the last axis."""
+    windows = encoded.shape[-1] - n + 1
+    index = np.zeros(encoded.shape[:-1] + (max(windows, 0),), dtype=np.intp)
+    if windows < 1:
+        return index
+    encoded = encoded.astype(np.intp)
+    for offset in range(n):
+        index *= ENGLISH_LANG_LEN
+        index += encoded[..., offset:offset + windows]
+    return index
+
+
+class NgramModel:
+    """Dense table of log10 probabilities for every n-gram of a-z."""
+
+    def __init__(self, n: int, log_probs: np.ndarray):
+        self.n = n
+        self.log_probs = log_probs
+        self.weights = tuple(
+            ENGLISH_LANG_LEN ** power for power in reversed(range(n))
+        )
+
+    @classmethod
+    def from_counts(cls, counts: np.ndarray, floor=QUADGRAM_FLOOR):
+        """Build a model from a dense array of n-gram counts."""
+        n = round(math.log(len(counts), ENGLISH_LANG_LEN))
+        log_probs = np.full(len(counts), floor, dtype=np.float32)
+        seen = counts > 0
+        log_probs[seen] = np.log10(counts[seen] / counts.sum())
+        return cls(n, log_probs)
+
+    @classmethod
+    def from_counts_file(cls, path: str, n: int, floor=QUADGRAM_FLOOR):
+        """Build a model from a file of 'NGRAM count' lines."""
+        ngrams = list()
+        counts = list()
+        with open(path) as f:
             for line in f:
                 line = line.split(" ")
-                english_4gram_expected_dict[line[0]] = int(line[1])
-                total += int(line[1])
-            for key, count in english_4gram_expected_dict.items():
-                english_4gram_expected_dict[key] = math.log10(count/total)
-    fitness = 0
-    text = letters(text).upper()
-    for index in range(len(text) - 3):
-        quadgram = text[index:index + 4]
-        if quadgram in english_4gram_expected_dict:
-            fitness += english_4gram_expected_dict[quadgram]
+                ngrams.append(line[0])
+                counts.append(int(line[1]))
+        counts = np.array(counts, dtype=np.float64)
+        log_probs = np.full(ENGLISH_LANG_LEN ** n, floor, dtype=np.float32)
+        model = cls(n, log_probs)
+        index = model.indices(encode("".join(ngrams)))[::n]
+        log_probs[index] = np.log10(counts / counts.sum())
+        return model
+
+    @classmethod
+    def load(cls, path: str):
+        """Memory-map a compiled model read-only."""
+        log_probs = np.asarray(np.load(path, mmap_mode="r"))
+        n = round(math.log(len(log_probs), ENGLISH_LANG_LEN))
+        return cls(n, log_probs)
+
+    def save(self, path: str):
+        """
+            Write the table as a compiled .npy model, replacing path
+            atomically so that concurrent readers never see half a file.
+        """
+        partial = "{}.{}.partial".format(path, os.getpid())
+        with open(partial, "wb") as f:
+            np.save(f, np.asarray(self.log_probs, dtype=np.float32))
+        os.replace(partial, path)
+
+    def indices(self, encoded: np.ndarray) -> np.ndarray:
+        """Return the table index of every n-gram along the last axis."""
+        return ngram_indices(encoded, self.n)
+
+    def score(self, encoded: np.ndarray) -> float:
+        """Return the fitness of an already encoded text."""
+        return float(
+            self.log_probs[self.indices(encoded)].sum(dtype=np.float64)
+        )
+
+    def score_batch(self, encoded: np.ndarray) -> np.ndarray:
+        """Return the fitness of each row of a candidates x letters array."""
+        return self.log_probs[self.indices(encoded)].sum(
+            axis=-1, dtype=np.float64
+        )
+
+    def score_ragged(self, encoded_texts: list) -> np.ndarray:
+        """Return the fitness of each of a list of encoded texts."""
+        lengths = np.array([len(text) for text in encoded_texts])
+        if not len(lengths):
+            return np.zeros(0)
+        ends = np.cumsum(lengths)
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        joined = np.concatenate(encoded_texts)
+        starts = np.arange(len(joined) - self.n + 1)
+        valid = starts + self.n <= ends[owner[starts]]
+        return np.bincount(
+            owner[starts][valid],
+            weights=self.log_probs[self.indices(joined)][valid],
+            minlength=len(lengths)
+        )
+
+
+NGRAM_NAMES = {
+    1: "monograms",
+    2: "bigrams",
+    3: "trigrams",
+    4: "quadgrams",
+    5: "quintgrams"
+}
+NGRAM_TABLES = {n: "english_" + name for n, name in NGRAM_NAMES.items()}
+
+
+def compile_model(name: str, n: int) -> str:
+    """Compile MODEL_DIR/name.txt into MODEL_DIR/name.npy if out of date."""
+    text_path = os.path.join(MODEL_DIR, name + ".txt")
+    binary_path = os.path.join(MODEL_DIR, name + ".npy")
+    if os.path.exists(text_path) and (
+        not os.path.exists(binary_path)
+        or os.path.getmtime(binary_path) < os.path.getmtime(text_path)
+    ):
+        NgramModel.from_counts_file(text_path, n).save(binary_path)
+    return binary_path
+
+
+@functools.lru_cache(maxsize=None)
+def english_model(n: int) -> NgramModel:
+    """
+        Load the english n-gram model on first use, compiling it if
+        needed. Only the bigram and quadgram tables ship; other orders
+        (tri- and quintgrams) raise FileNotFoundError until built with
+        train_ngrams.py --prefix english, except monograms, which fall
+        back to the Wikipedia letter frequencies.
+    """
+    name = NGRAM_TABLES[n]
+    paths = [os.path.join(MODEL_DIR, name + ext) for ext in (".npy", ".txt")]
+    if not any(os.path.exists(path) for path in paths):
+        if n == 1:
+            return NgramModel(1, np.log10(
+                english_1gram_expected / english_1gram_expected.sum()
+            ).astype(np.float32))
+        raise FileNotFoundError(
+            "no english {} table in {}: build one with "
+            "python train_ngrams.py --prefix english --orders {} "
+            "CORPUS...".format(NGRAM_NAMES[n], MODEL_DIR, n)
+        )
+    try:
+        return NgramModel.load(compile_model(name, n))
+    except (OSError, ValueError):
+        # Read-only checkout or unreadable table: parse the text table
+        # in memory instead.
+        return NgramModel.from_counts_file(
+            os.path.join(MODEL_DIR, name + ".txt"), n
+        )
+
+
+class NgramCounter:
+    """
+        Accumulate n-gram counts over a stream of text chunks.
+        Memory stays bounded by the dense count tables, whatever the
+        corpus size; the last few letters of each chunk are carried
+        over so n-grams spanning two chunks are still counted.
+    """
+
+    def __init__(self, orders: tuple=(1, 2, 3, 4, 5)):
+        self.counts = {
+            n: np.zeros(ENGLISH_LANG_LEN ** n, dtype=np.int64)
+            for n in orders
+        }
+        self.carry = max(orders) - 1
+        self.tail = np.empty(0, dtype=np.uint8)
+
+    def update(self, text: str):
+        """Count the n-grams of the next chunk of text."""
+        encoded = np.concatenate((self.tail, encode(text)))
+        for n, counts in self.counts.items():
+            # Windows wholly inside the tail were counted last chunk.
+            start = max(len(self.tail) - (n - 1), 0)
+            index, frequency = np.unique(
+                ngram_indices(encoded[start:], n), return_counts=True
+            )
+            counts[index] += frequency
+        if self.carry:
+            self.tail = encoded[-self.carry:]
+
+    def update_file(self, path: str, chunk_size: int=1 << 20):
+        """Stream a text file through update, chunk_size characters at once."""
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            for chunk in iter(lambda: f.read(chunk_size), ""):
+                self.update(chunk)
+
+    def model(self, n: int, floor=QUADGRAM_FLOOR) -> NgramModel:
+        """Return the n-gram model of everything counted so far."""
+        return NgramModel.from_counts(self.counts[n], floor=floor)
+
+    def save(self, directory: str, prefix="english", floor=QUADGRAM_FLOOR):
+        """Write every order as directory/prefix_<name>.npy."""
+        paths = list()
+        for n in self.counts:
+            path = os.path.join(
+                directory, prefix + "_" + NGRAM_NAMES[n] + ".npy"
+            )
+            self.model(n, floor=floor).save(path)
+            paths.append(path)
+        return paths
+
+
+def english_quadgram_model() -> NgramModel:
+    """Return the quadgram model."""
+    return english_model(4)
+
+
+def english_ngram_fitness(text: str, n: int=4) -> float:
+    """Return the fitness of a text, based on n-gram count."""
+    return english_model(n).score(encode(text))
+
+
+def english_quadgram_fitness(text: str) -> float:
+    """Return the fitness of a text, based on quadgram count."""
+    return english_quadgram_model().score(encode(text))
+
+
+Calibration = collections.namedtuple(
+    "Calibration", ['n', 'mean', 'text_std', 'window_std']
+)
+# Measured on the Challenge20xx plaintexts by train_ngrams.py --calibrate:
+# the per-quadgram score of an English passage of w windows has spread
+# sqrt(text_std^2 + window_std^2/w).
+ENGLISH_QUADGRAM_CALIBRATION = Calibration(
+    n=4, mean=-4.19, text_std=0.061, window_std=1.256
+)
+ENGLISH_CONFIDENCE = 0.01
+# Annealing chains whose best key is still this unlikely to be English
+# restart, a loose bound that a chain near the plaintext clears.
+RESTART_CONFIDENCE = 1e-10
+
+
+def calibrate(texts, n: int=4, size: int=25) -> Calibration:
+    """
+        Fit a Calibration for english_model(n) from English texts, using
+        the spread of their per-n-gram scores over blocks of size and
+        of 4 * size windows.
+    """
+    model = english_model(n)
+    scores = [
+        model.log_probs[model.indices(encode(text))] for text in texts
+    ]
+    variances = list()
+    for block in (size, 4 * size):
+        variances.append(np.var([
+            score[start:start + block].mean()
+            for score in scores
+            for start in range(0, len(score) - block + 1, block)
+        ]))
+    window_var = (variances[0] - variances[1]) / (1 / size - 1 / (4 * size))
+    return Calibration(
+        n=n,
+        mean=float(np.concatenate(scores).mean()),
+        text_std=math.sqrt(max(variances[1] - window_var / (4 * size), 0)),
+        window_std=math.sqrt(window_var)
+    )
+
+
+def ngram_windows(letters: int, n: int=4) -> int:
+    return max(letters - n + 1, 1)
+
+
+def per_ngram_fitness(fitness: float, letters: int, n: int=4) -> float:
+    """Return a fitness over letters letters as a mean per n-gram."""
+    return fitness / ngram_windows(letters, n)
+
+
+def english_spread(windows: int, calibration: Calibration) -> float:
+    return math.sqrt(
+        calibration.text_std ** 2 + calibration.window_std ** 2 / windows
+    )
+
+
+def english_confidence(
+    fitness: float,
+    letters: int,
+    calibration: Calibration=ENGLISH_QUADGRAM_CALIBRATION
+) -> float:
+    """
+        Return the probability that genuine English of letters letters
+        scores fitness or lower, so real plaintext of any length clears
+        ENGLISH_CONFIDENCE 99% of the time.
+    """
+    windows = ngram_windows(letters, calibration.n)
+    return statistics.NormalDist(
+        calibration.mean, english_spread(windows, calibration)
+    ).cdf(per_ngram_fitness(fitness, letters, calibration.n))
+
+
+def english_target(
+    letters: int,
+    confidence: float=ENGLISH_CONFIDENCE,
+    calibration: Calibration=ENGLISH_QUADGRAM_CALIBRATION
+) -> float:
+    """Return the fitness at which english_confidence reaches confidence."""
+    windows = ngram_windows(letters, calibration.n)
+    return statistics.NormalDist(
+        calibration.mean, english_spread(windows, calibration)
+    ).inv_cdf(confidence) * windows
+
+
+class DeltaScorer:
+    """Keep the per-window scores of a plaintext so edits rescore cheaply."""
+
+    def __init__(self, plain: np.ndarray, model: NgramModel=None):
+        self.model = model or english_quadgram_model()
+        self.plain = np.array(plain, dtype=np.intp)
+        self.offsets = np.arange(self.model.n)
+        self.weights = np.array(self.model.weights, dtype=np.intp)
+        self.contributions = self.model.log_probs[
+            self.model.indices(self.plain)
+        ].astype(np.float64)
+        self.fitness = float(self.contributions.sum())
+
+    def windows(self, positions: np.ndarray) -> np.ndarray:
+        """Return the start of every window covering one of positions."""
+        # Starts before 0 wrap, and starts past the last window fall,
+        # into the n padding slots at the end of the mask.
+        covered = np.zeros(len(self.contributions) + self.model.n, dtype=bool)
+        covered[(positions[:, None] - self.offsets).ravel()] = True
+        return np.flatnonzero(covered[:len(self.contributions)])
+
+    def update(self, positions: np.ndarray, values: np.ndarray) -> float:
+        """Set plain[positions] to values and return the new fitness."""
+        if not len(positions):
+            return self.fitness
+        self.plain[positions] = values
+        windows = self.windows(positions)
+        new = self.model.log_probs[
+            self.plain[windows[:, None] + self.offsets] @ self.weights
+        ]
+        self.fitness += float(
+            new.sum(dtype=np.float64) - self.contributions[windows].sum()
+        )
+        self.contributions[windows] = new
+        return self.fitness
+
+
+class DeltaFitness:
+    """
+        Key fitness callable that rescores only the plaintext positions
+        that changed since the previous key it was given.
+
+        decrypt(key) returns the whole encoded plaintext,
+        decrypt(key, positions) only the letters at positions.
+        changed(old_key, key) returns the positions that may differ,
+        or None when everything has to be rescored. A change reaching
+        more than FULL_RESCORE of the windows is rescored in full too,
+        one gather over the text being cheaper then.
+    """
+
+    FULL_RESCORE = 0.25
+
+    def __init__(self, decrypt, changed, model: NgramModel=None):
+        self.decrypt = decrypt
+        self.changed = changed
+        self.model = model
+        self.key = None
+        self.scorer = None
+
+    def __call__(self, key) -> float:
+        positions = None
+        if self.scorer is not None:
+            positions = self.changed(self.key, key)
+            if positions is not None and len(positions) * self.model.n > (
+                DeltaFitness.FULL_RESCORE * len(self.scorer.contributions)
+            ):
+                positions = None
+        if positions is None:
+            self.scorer = DeltaScorer(self.decrypt(key), self.model)
         else:
-            fitness -= 10
-    return fitness
+            self.scorer.update(positions, self.decrypt(key, positions))
+        self.key = key
+        return self.scorer.fitness
+
+
+CacheStats = collections.namedtuple(
+    "CacheStats", ['hits', 'misses', 'evictions', 'size']
+)
+
+
+class FitnessCache:
+    """
+        Bounded memo in front of a key fitness callable, keyed on the
+        compact key, so revisited keys skip decryption and scoring.
+        policy is "lru" (evict least recently used) or "fifo".
+    """
+
+    POLICIES = ("lru", "fifo")
+
+    def __init__(self, fitness, maxsize: int=65536, policy: str="lru"):
+        if policy not in FitnessCache.POLICIES:
+            raise ValueError("Unknown eviction policy: " + policy)
+        self.fitness = fitness
+        self.maxsize = maxsize
+        self.policy = policy
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def compact(key):
+        """Return a hashable form of a key."""
+        if isinstance(key, dict):
+            return tuple(sorted(key.items()))
+        if isinstance(key, list):
+            return tuple(key)
+        if isinstance(key, np.ndarray):
+            return key.tobytes()
+        return key
+
+    def __call__(self, key) -> float:
+        compact = self.compact(key)
+        if compact in self.entries:
+            self.hits += 1
+            if self.policy == "lru":
+                self.entries.move_to_end(compact)
+            return self.entries[compact]
+        self.misses += 1
+        fitness = self.fitness(key)
+        self.entries[compact] = fitness
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return fitness
+
+    @property
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            self.hits, self.misses, self.evictions, len(self.entries)
+        )
 
 # -----------------------
 # -----------------------
@@ -304,7 +1915,7 @@ def english_quadgram_fitness(text: str) -> float:
 class Caesar:
 
     def __init__(self, text: str, shift: int=0, forced: bool=False):
-        self.text = text
+        self.text = CipherText.of(text)
         self.shift = shift
         self.auto = not (bool(self.shift) or forced)
 
@@ -337,51 +1948,26 @@ class Caesar:
 class Affine:
 
     Key = collections.namedtuple('AffineKey', ['a', 'b'])
-    TextChiKey = collections.namedtuple('TextChiKey', ['text', 'chi', 'key'])
-    MAX_SEARCH = 5
 
     def __init__(self, text: str, switch: tuple=(1, 0)):
-        self.text = text
+        self.text = CipherText.of(text)
         self.key = Affine.Key(*switch)
         self.auto = bool(sum(switch) < 2)
 
     @property
-    def modal_pairs(self):
-        """Find the possible pairs of 'e' and 't' in the text."""
-        freq_chars = (
-            freq.character for freq in auto_freq_analyser(
-                self.text
-            )[0:Affine.MAX_SEARCH]
+    def best_key(self):
+        """Score every affine key in one batch and return the fittest."""
+        keys = list(
+            Affine.Key(a, b)
+            for a in range(ENGLISH_LANG_LEN)
+            if math.gcd(a, ENGLISH_LANG_LEN) == 1
+            for b in range(ENGLISH_LANG_LEN)
         )
-        return itertools.permutations(freq_chars, 2)
-
-    @property
-    def prob_keys(self) -> list:
-        """
-        Finds the possible affine keys according to this formula:
-        a*c1 + b = p1
-        a*c2 + b = p2
-        a*(c1 - c2) = p1 - p2
-        a = (p1 - p2)(c1 - c2) ^ -1
-        b = p1 - a*c1
-        """
-        for pair in self.modal_pairs:
-            try:
-                cipher1 = english_chars.index(pair[0])
-                plain1 = english_chars.index("e")
-                cipher2 = english_chars.index(pair[1])
-                plain2 = english_chars.index("t")
-                a = (plain1 - plain2)*mod_inverse(
-                    num=(cipher1 - cipher2),
-                    mod=ENGLISH_LANG_LEN) % ENGLISH_LANG_LEN
-                b = (plain1 - a*cipher1) % ENGLISH_LANG_LEN
-            except ValueError:
-                print("FAILED")
-                continue
-            else:
-                yield Affine.Key(a, b)
-                # possible_keys.append(Affine.Key(a, b))
-        # return possible_keys
+        a = np.array(list(key.a for key in keys))[:, None]
+        b = np.array(list(key.b for key in keys))[:, None]
+        candidates = (a * self.text.encoded + b) % ENGLISH_LANG_LEN
+        fitnesses = english_quadgram_model().score_batch(candidates)
+        return keys[int(np.argmax(fitnesses))]
 
     @staticmethod
     def char_shift(char: str, key) -> str:
@@ -394,28 +1980,11 @@ class Affine:
     def encipher(self, give_key=False) -> str:
         """Encrypt the given text."""
         if self.auto:
-            possible_texts = list()
-            for key in self.prob_keys:
-                deciphered = "".join(
-                    self.char_shift(char, key) if char.isalpha()
-                    else char for char in self.text
-                )
-                possible_texts.append(
-                    Affine.TextChiKey(
-                        text=deciphered,
-                        chi=english_1gram_chi(deciphered),
-                        key=key
-                    )
-                )
-            best = sorted(
-                possible_texts, key=lambda elem: elem.chi)[0]
-            enciphered = best.text
-            self.key = best.key
-        else:
-            enciphered = "".join(
-                self.char_shift(char, self.key) if char.isalpha()
-                else char for char in self.text
-            )
+            self.key = self.best_key
+        enciphered = "".join(
+            self.char_shift(char, self.key) if char.isalpha()
+            else char for char in self.text
+        )
         if give_key:
             return TextKey(match(self.text, enciphered), self.key)
         else:
@@ -424,54 +1993,35 @@ class Affine:
 
 class Viginere:
 
-    ChiShift = collections.namedtuple("ChiShift", ['chi', 'shift'])
     MAX_SEARCH = 100
 
     def __init__(self, text: str, key: str=""):
-        self.text = text
+        self.text = CipherText.of(text)
         self.key = key
         self.auto = not bool(key)
 
     @property
     def prob_key_length(self) -> int:
-        text = letters(self.text).lower()
-        for possible_length in range(2, Viginere.MAX_SEARCH):
-            split_text = list(
-                "".join(text[offset::possible_length])
-                for offset in range(possible_length)
-            )
-            average_codex = sum(
-                codex(split) for split in split_text
-            ) / len(split_text)
-            if average_codex > ENGLISH_LOWER_CODEX:
-                # print("Found one!")
-                return possible_length
+        stats = self.text.statistics(range(2, Viginere.MAX_SEARCH))
+        average_codex = np.nansum(stats.codex, axis=1) / stats.periods
+        found = np.flatnonzero(average_codex > ENGLISH_LOWER_CODEX)
+        if len(found):
+            return int(stats.periods[found[0]])
         else:
             return 1
 
     @property
     def split_text(self):
-        text = letters(self.text).lower()
-        return (
-            "".join(text[offset::self.prob_key_length])
-            for offset in range(self.prob_key_length)
-        )
+        return iter(self.text.columns(self.prob_key_length))
 
     @property
     def prob_key(self) -> str:
         shifts = list()
         for split in self.split_text:
-            split_shifts = list()
-            for possible_shift in range(ENGLISH_LANG_LEN):
-                shifted_text = Caesar(
-                    split, shift=possible_shift, forced=True).encipher()
-                split_shifts.append(
-                    Viginere.ChiShift(
-                        english_1gram_chi(shifted_text),
-                        possible_shift
-                    )
-                )
-            split_shift = sorted(split_shifts)[0].shift
+            shifted = (
+                encode(split) + np.arange(ENGLISH_LANG_LEN)[:, None]
+            ) % ENGLISH_LANG_LEN
+            split_shift = int(np.argmin(english_1gram_chi_batch(shifted)))
             shifts.append(-1*split_shift % ENGLISH_LANG_LEN)
         return "".join(english_chars[shift] for shift in shifts)
 
@@ -480,11 +2030,7 @@ class Viginere:
             self.key = self.prob_key
             split_text = self.split_text
         else:
-            text = letters(self.text).lower()
-            split_text = (
-                "".join(text[offset::len(self.key)])
-                for offset in range(len(self.key))
-            )
+            split_text = self.text.columns(len(self.key))
         shifted_split = list()
         for index, split in enumerate(split_text):
             split = Caesar(
@@ -505,7 +2051,7 @@ class Viginere:
 
 class AffineViginere:
     def __init__(self, text: str, key: str="", switch: tuple=(1, 0)):
-        self.text = text
+        self.text = CipherText.of(text)
         self.key = key
         self.switch = Affine.Key(*switch)
         self.auto = bool(sum(switch) < 2)
@@ -533,28 +2079,27 @@ class Scytale:
     MAX_SEARCH = 10
 
     def __init__(self, text: str, key: int=1, auto: bool=True, keep=[]):
-        self.text = text
+        self.text = CipherText.of(text)
         self.key = key
         self.auto = not bool(key > 1)
         self.keep = keep
 
     def encipher(self, give_key=False, pretty=False) -> str:
-        text = letters(self.text, keep=self.keep).lower()
+        text = self.text.kept(self.keep).lower()
         if self.auto:
-            possible_texts = list()
-            for length in range(1, Scytale.MAX_SEARCH):
-                skip = round(len(text) / length)
-                possible_text = "".join(
-                    text[i::skip]
-                    for i in range(skip)
-                )
-                possible_texts.append(
-                    Scytale.TextFitLen(
-                        text=possible_text,
-                        fitness=english_quadgram_fitness(possible_text),
-                        length=length
-                    )
+            candidates = list(
+                Transposition.scytale(len(text), length).apply(text)
+                for length in range(1, Scytale.MAX_SEARCH)
+            )
+            fitnesses = english_quadgram_model().score_ragged(
+                list(encode(candidate) for candidate in candidates)
+            )
+            possible_texts = list(
+                Scytale.TextFitLen(text=candidate, fitness=fitness, length=length)
+                for length, (candidate, fitness) in enumerate(
+                    zip(candidates, fitnesses), start=1
                 )
+            )
             best = sorted(
                 possible_texts,
                 key=lambda text_fit: text_fit.fitness,
@@ -563,11 +2108,9 @@ class Scytale:
             enciphered = best.text
             self.key = best.length
         else:
-            skip = round(len(text) / self.key)
-            enciphered = "".join(
-                text[i::skip]
-                for i in range(skip)
-            )
+            enciphered = Transposition.scytale(
+                len(text), self.key
+            ).apply(text)
         if pretty:
             enciphered = match(self.text, enciphered)
         if give_key:
@@ -581,14 +2124,14 @@ class ScytaleViginere:
     MAX_SEARCH = 10
 
     def __init__(self, text: str, length: int=1, key: str="", keep=[]):
-        self.text = text
+        self.text = CipherText.of(text)
         self.length = length
         self.key = key
         self.auto = not bool(key)
         self.keep = keep
 
     def encipher(self):
-        text = letters(self.text, keep=self.keep).lower()
+        text = self.text.kept(self.keep).lower()
         if self.auto:
             for length in range(2, ScytaleViginere.MAX_SEARCH):
                 possible_text = Scytale(
@@ -612,11 +2155,30 @@ class MonoSub:
     CharSwap = collections.namedtuple('CharSwap', ['char', 'swap_char'])
     MAX_SEARCH = 1000
 
-    def __init__(self, text: str, key=None, keyword=False, alternative=False):
-        self.text = text
+    def __init__(
+        self,
+        text: str,
+        key=None,
+        keyword=False,
+        alternative=False,
+        max_evaluations=None,
+        time_limit=None,
+        telemetry=None,
+        seed=None,
+        deadline=None,
+        search="climb"
+    ):
+        self.text = CipherText.of(text)
         self.key = key
         self.auto = not bool(key)
         self.alternative = alternative
+        self.max_evaluations = max_evaluations
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.telemetry = telemetry
+        self.search = search
+        self.seed = new_seed() if seed is None else seed
+        self.target = english_target(len(self.text.stripped))
         if keyword:
             self.key = self.keyword_to_key(key, self.alternative)
 
@@ -656,29 +2218,200 @@ class MonoSub:
 
     @staticmethod
     def gen_neigbors_key(key):
-        for swap1, swap2 in itertools.combinations(range(ENGLISH_LANG_LEN), 2):
-            new_key = list(list(item) for item in key.items())
-            pair1, pair2 = new_key[swap1], new_key[swap2]
-            pair1[1], pair2[1] = pair2[1], pair1[1]
-            yield {char: swap_char for char, swap_char in new_key}
+        chars = list(key)[:ENGLISH_LANG_LEN]
+        for char1, char2 in itertools.combinations(chars, 2):
+            new_key = key.copy()
+            new_key[char1], new_key[char2] = key[char2], key[char1]
+            yield new_key
+
+    @staticmethod
+    def kick_key(key, rng=random, swaps: int=4):
+        """Return key with a few random pairs of mappings swapped."""
+        new_key = key.copy()
+        chars = list(key)[:ENGLISH_LANG_LEN]
+        for _ in range(swaps):
+            char1, char2 = rng.sample(chars, 2)
+            new_key[char1], new_key[char2] = new_key[char2], new_key[char1]
+        return new_key
 
     @property
     def text_fitness(self):
         def key_fitness(key):
             return english_quadgram_fitness(
-                self.encipher(key=key)
+                self.encipher(key=key, formatted=False)
             )
         return key_fitness
 
     @property
-    def best_key(self) -> dict:
-        return hill_climbing(
-            initial_key=self.prob_key,
-            fitness=self.text_fitness,
-            neighbors=MonoSub.gen_neigbors_key
+    def delta_fitness(self):
+        """Key fitness that only rescores letters whose mapping changed."""
+        return self.ngram_fitness()
+
+    def ngram_fitness(self, n: int=4):
+        """Return a delta key fitness scored with the english n-gram model."""
+        text = self.text.lower()
+        layout = dict()
+
+        def plain_table(key):
+            """Return the plaintext letter of each symbol as 0-25."""
+            if layout.get("table_key") is not key:
+                symbols = layout["symbols"]
+                layout["table_key"] = key
+                layout["table"] = LETTER_INDEX[np.frombuffer(
+                    "".join(map(key.get, symbols, symbols)).encode("ascii"),
+                    dtype=np.uint8
+                )]
+            return layout["table"]
+
+        def same_layout(key) -> bool:
+            # Keys sending the same cipher letters to letters only keep
+            # the same plaintext positions.
+            return bool(layout) and layout["letters_only"] and (
+                key.keys() == layout["keys"]
+                and set(key.values()) == layout["values"]
+            )
+
+        def decrypt(key, positions=None):
+            if positions is None and not same_layout(key):
+                kept = [
+                    char for char in text
+                    if key.get(char, char).lower() in english_chars
+                ]
+                layout["keys"] = set(key)
+                layout["values"] = set(key.values())
+                layout["letters_only"] = all(
+                    value.lower() in english_chars for value in key.values()
+                )
+                layout["symbols"] = sorted(set(kept))
+                ids = {char: i for i, char in enumerate(layout["symbols"])}
+                cipher = np.array([ids[char] for char in kept], dtype=np.intp)
+                layout["cipher"] = cipher
+                layout["occurrences"] = [
+                    np.flatnonzero(cipher == i)
+                    for i in range(len(layout["symbols"]))
+                ]
+                layout.pop("table_key", None)
+            layout["current"] = plain_table(key)
+            if positions is None:
+                return layout["current"][layout["cipher"]]
+            return layout["current"][layout["cipher"][positions]]
+
+        def changed(old_key, key):
+            if not same_layout(key):
+                return None
+            # current holds the table of old_key, the last key decrypted.
+            moved = np.flatnonzero(plain_table(key) != layout["current"])
+            return np.concatenate([np.empty(0, dtype=np.intp)] + [
+                layout["occurrences"][symbol] for symbol in moved
+            ])
+
+        return DeltaFitness(decrypt, changed, english_model(n))
+
+    def batch_fitness(self, n: int=4):
+        """Return a fitness scoring a list of keys on the same symbols."""
+        text = self.text.lower()
+        model = english_model(n)
+        layout = dict()
+
+        def fitness(keys):
+            if not layout:
+                kept = [
+                    char for char in text
+                    if keys[0].get(char, char).lower() in english_chars
+                ]
+                layout["symbols"] = sorted(set(kept))
+                ids = {char: i for i, char in enumerate(layout["symbols"])}
+                layout["cipher"] = np.array(
+                    [ids[char] for char in kept], dtype=np.intp
+                )
+            tables = np.array([
+                [
+                    ord(key.get(char, char).lower()) - ord("a")
+                    for char in layout["symbols"]
+                ]
+                for key in keys
+            ])
+            return model.score_batch(tables[:, layout["cipher"]])
+
+        return fitness
+
+    @staticmethod
+    def crossover(key1, key2, rng=random):
+        """Order crossover of two keys over the same cipher letters."""
+        chars = list(key1)
+        child = order_crossover(
+            tuple(key1[char] for char in chars),
+            tuple(key2[char] for char in chars),
+            rng
         )
+        return dict(zip(chars, child))
 
-    def encipher(self, key: dict={}, give_key=False) -> str:
+    @property
+    def best_key(self) -> dict:
+        # Climb cheaply on bigrams first, then polish on quadgrams,
+        # kicking out of local optima while any budget remains, or
+        # with a tabu or genetic search.
+        rng = random.Random(self.seed)
+        deadline = budget_deadline(self.time_limit, self.deadline)
+        self.fitness_cache = FitnessCache(self.ngram_fitness(2))
+        with measure(self.telemetry, "MonoSub.bigram", self.fitness_cache):
+            rough_key = hill_climbing(
+                initial_key=self.prob_key,
+                fitness=self.fitness_cache,
+                neighbors=MonoSub.gen_neigbors_key,
+                mode="first",
+                shuffle=True,
+                report=self.telemetry,
+                rng=rng,
+                deadline=deadline
+            )
+        if self.search == "genetic":
+            search = GeneticSearch(
+                batch_fitness=self.batch_fitness(),
+                new_key=functools.partial(MonoSub.kick_key, swaps=1),
+                crossover=MonoSub.crossover,
+                population=200,
+                generations=300,
+                stale=50,
+                deadline=deadline,
+                target=self.target,
+                report=self.telemetry,
+                rng=rng
+            )
+            initial = [rough_key] + [
+                MonoSub.kick_key(rough_key, rng)
+                for _ in range(search.population - 1)
+            ]
+            with measure(self.telemetry, "MonoSub.evolve"):
+                return search.run(initial)
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        if self.search == "tabu":
+            with measure(self.telemetry, "MonoSub.tabu", self.fitness_cache):
+                return TabuSearch(
+                    fitness=self.fitness_cache,
+                    neighbors=MonoSub.gen_neigbors_key,
+                    tenure=20,
+                    count=300,
+                    stale=50,
+                    max_evaluations=self.max_evaluations,
+                    deadline=deadline,
+                    target=self.target,
+                    report=self.telemetry,
+                    rng=rng
+                ).run(rough_key)
+        with measure(self.telemetry, "MonoSub.quadgram", self.fitness_cache):
+            return HillClimber(
+                fitness=self.fitness_cache,
+                neighbors=MonoSub.gen_neigbors_key,
+                restart=MonoSub.kick_key,
+                max_evaluations=self.max_evaluations,
+                report=self.telemetry,
+                target=self.target,
+                rng=rng,
+                deadline=deadline
+            ).run(rough_key)
+
+    def encipher(self, key: dict={}, give_key=False, formatted=True) -> str:
         if not key:
             if self.key:
                 key = self.key
@@ -688,16 +2421,17 @@ class MonoSub:
             key[char] if char in key
             else char for char in self.text.lower()
         )
-        # return TextKey(enciphered, key)
+        if formatted:
+            enciphered = match(self.text, enciphered)
         if give_key:
-            return TextKey(match(self.text, enciphered), key)
+            return TextKey(enciphered, key)
         else:
-            return match(self.text, enciphered)
+            return enciphered
 
 
 class DuoSub:
     def __init__(self, text, key_square: list=[]):
-        self.text = text
+        self.text = CipherText.of(text)
         if key_square:
             self.key = self.create_substitution_dict(key_square)
         self.auto = not bool(key_square)
@@ -738,7 +2472,7 @@ class DuoSub:
                 self.key = enciphered.key
                 enciphered = enciphered.text
         else:
-            new_text = letters(self.text).lower()
+            new_text = self.text.stripped
             split_text = (
                 new_text[i: i + 2] for i in range(0, len(new_text), 2)
             )
@@ -751,7 +2485,7 @@ class DuoSub:
 
 class MultiSub:
     def __init__(self, text, size, keep=[]):
-        self.text = text
+        self.text = CipherText.of(text)
         self.size = size
         self.keep = keep
 
@@ -786,7 +2520,7 @@ class Straddle:
         'TextKeyCodex', ['text', 'key', 'codex'])
 
     def __init__(self, text):
-        self.text = text
+        self.text = CipherText.of(text)
 
     def convert_to_eng(self, blanks):
         row_num = 0
@@ -847,11 +2581,39 @@ class Straddle:
 
 
 class AutoKey:
-    def __init__(self, text: str, size, key: str="", reset: int=None):
-        self.text = text
+    def __init__(
+        self,
+        text: str,
+        size,
+        key: str="",
+        reset: int=None,
+        workers=1,
+        telemetry=None,
+        seed=None,
+        checkpoint=None,
+        resume=False,
+        time_limit=None,
+        deadline=None,
+        schedule=linear_cooling,
+        acceptance=None
+    ):
+        self.text = CipherText.of(text)
         self.key = key
         self.auto = not bool(key)
         self.size = size
+        self.workers = workers
+        self.telemetry = telemetry
+        self.seed = new_seed() if seed is None else seed
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.schedule = schedule
+        self.acceptance = acceptance
+        self.target = english_target(len(self.text.stripped))
+        self.restart_fitness = english_target(
+            len(self.text.stripped), RESTART_CONFIDENCE
+        )
         if reset:
             self.reset = reset
 
@@ -874,30 +2636,55 @@ class AutoKey:
         return key_fitness
 
     @staticmethod
-    def gen_new_key(key):
-        choice = random.randrange(len(key))
-        new_letter = english_chars[random.randrange(26)]
+    def gen_new_key(key, rng=random):
+        choice = rng.randrange(len(key))
+        new_letter = english_chars[rng.randrange(26)]
         new_key = list(key)
         new_key[choice] = new_letter
         return "".join(new_key)
 
-    @property
-    def best_key(self):
+    @staticmethod
+    def random_key(key, rng=random):
+        """Return a random primer as long as key."""
+        return "".join(rng.choice(english_chars) for _ in key)
+
+    def anneal(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
         initial = "".join(
-            random.choice(english_chars)
+            rng.choice(english_chars)
             for i in range(self.size)
         )
-        return simulated_annealing(
-            initial_key=initial,
-            fitness=self.text_fitness,
+        self.fitness_cache = FitnessCache(self.text_fitness)
+        annealer = Annealer(
+            fitness=self.fitness_cache,
             new_key=AutoKey.gen_new_key,
             initial_temp=30,
             count=10000,
             max_length=1000,
             stale=5000,
-            stale_fitness=-20000,
-            threshold=-19000
+            stale_fitness=self.restart_fitness,
+            threshold=self.restart_fitness,
+            restart=AutoKey.random_key,
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            checkpoint=chain_checkpoint(self.checkpoint, seed, self.seed),
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            schedule=self.schedule,
+            acceptance=self.acceptance
         )
+        with measure(self.telemetry, "AutoKey.anneal", self.fitness_cache):
+            key = annealer.start(initial, self.resume)
+        return KeyFit(key, annealer.best_fitness)
+
+    @property
+    def best_key(self):
+        best = best_of_chains(
+            self.anneal, self.workers, accept=self.target, seed=self.seed
+        )
+        self.chain_seed = best.seed
+        return best.key
 
     def encipher(self, key="", give_key=False, pretty=False):
         if not key:
@@ -905,7 +2692,7 @@ class AutoKey:
                 key = self.key
             else:
                 key = self.best_key
-        text = letters(self.text).lower()
+        text = self.text.stripped
         if hasattr(self, "reset"):
             split_text = list(
                 text[i:i + self.reset]
@@ -938,104 +2725,448 @@ class AutoKey:
             return enciphered
 
 
+def _solve_length(job: tuple) -> tuple:
+    solver, stop = _worker_job
+    length, deadline = job
+    key, fitness = solver.solve_length(length, deadline, stop.is_set)
+    return key, fitness
+
+
 class ColTrans:
 
-    MAX_SEARCH = 10
+    MAX_SEARCH = 21
+    LENGTH_CANDIDATES = 3
+    BEAM_WIDTH = 200
 
     TextFitPerm = collections.namedtuple(
         'TextFitnessPermutation',
         ['text', 'fitness', 'perm']
     )
 
-    def __init__(self, text, key: tuple=(), guessed_length: int=1, keep=[]):
-        self.text = text
+    def __init__(
+        self,
+        text,
+        key: tuple=(),
+        guessed_length: int=1,
+        keep=[],
+        workers=1,
+        telemetry=None,
+        seed=None,
+        checkpoint=None,
+        resume=False,
+        time_limit=None,
+        deadline=None,
+        schedule=linear_cooling,
+        acceptance=None,
+        search="anneal"
+    ):
+        self.text = CipherText.of(text)
         self.key = key
         self.guessed_length = guessed_length
         self.auto_length = guessed_length == 1
         self.keep = keep
+        self.workers = workers
+        self.telemetry = telemetry
+        self.seed = new_seed() if seed is None else seed
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.schedule = schedule
+        self.acceptance = acceptance
+        self.search = search
+        self.target = english_target(len(self.text.stripped))
         self.auto = not bool(key)
 
-    @staticmethod
-    def permute(block: str, key: tuple):
-        if len(block) > len(key):
-            return block
-        elif len(block) < len(key):
-            block = pad_to_length(block, len(key))
-        else:
-            pass
-        return "".join(
-            block[perm_index]
-            for perm_index in key
-        )
-
     @property
     def text_fitness(self):
         def key_fitness(key):
             return english_quadgram_fitness(self.encipher(key=key))
         return key_fitness
 
+    @property
+    def delta_fitness(self):
+        """Key fitness that only rescores the columns that moved."""
+        return self.ngram_fitness()
+
+    def ngram_fitness(self, n: int=4):
+        """Return a delta key fitness scored with the english n-gram model."""
+        text = self.text.kept(self.keep)
+        cipher = encode(text).astype(np.intp)
+        pure = len(cipher) == len(text)
+
+        def decrypt(key, positions=None):
+            if not pure:
+                return encode(self.encipher(key=key))
+            if positions is None:
+                return Transposition.columnar(len(cipher), key).apply(cipher)
+            length = len(key)
+            base = len(cipher) - len(cipher) % length
+            tail = cipher[base:][[k for k in key if k < len(cipher) - base]]
+            key = np.array(key)
+            body = positions < base
+            values = np.empty(len(positions), dtype=np.intp)
+            values[body] = cipher[
+                positions[body] - positions[body] % length
+                + key[positions[body] % length]
+            ]
+            values[~body] = tail[positions[~body] - base]
+            return values
+
+        def changed(old_key, key):
+            if not pure or len(old_key) != len(key):
+                return None
+            columns = np.flatnonzero(np.array(old_key) != np.array(key))
+            if not len(columns):
+                return columns
+            length = len(key)
+            base = len(cipher) - len(cipher) % length
+            return np.concatenate((
+                (np.arange(0, base, length)[:, None] + columns).ravel(),
+                np.arange(base, len(cipher))
+            ))
+
+        return DeltaFitness(decrypt, changed, english_model(n))
+
+    def batch_fitness(self, n: int=4):
+        """Return a fitness scoring a list of same-length keys at once."""
+        text = self.text.kept(self.keep)
+        cipher = encode(text).astype(np.intp)
+        pure = len(cipher) == len(text)
+        model = english_model(n)
+
+        def fitness(keys):
+            if not pure:
+                return model.score_ragged([
+                    encode(self.encipher(key=key)) for key in keys
+                ])
+            keys = np.array(keys, dtype=np.intp)
+            length = keys.shape[1]
+            base = len(cipher) - len(cipher) % length
+            positions = np.arange(base)
+            index = np.empty((len(keys), len(cipher)), dtype=np.intp)
+            index[:, :base] = (
+                positions - positions % length + keys[:, positions % length]
+            )
+            short = keys < len(cipher) - base
+            index[:, base:] = base + keys[short].reshape(len(keys), -1)
+            return model.score_batch(cipher[index])
+
+        return fitness
+
     @staticmethod
-    def swap_two_pos(key):
-        swap1, swap2 = tuple(random.choices(range(len(key)), k=2))
+    def swap_two_pos(key, rng=random):
+        swap1, swap2 = tuple(rng.choices(range(len(key)), k=2))
         new_key = list(key)
         new_key[swap1], new_key[swap2] = new_key[swap2], new_key[swap1]
         return tuple(new_key)
 
     @staticmethod
-    def segment_slide(key):
-        seg_1, seg_2 = random.sample(range(len(key)), k=2)
+    def segment_slide(key, rng=random):
+        seg_1, seg_2 = rng.sample(range(len(key)), k=2)
         if seg_1 > seg_2:
             seg_1, seg_2 = seg_2, seg_1
         segment = key[seg_1:seg_2]
         key_no_seg = key[:seg_1] + key[seg_2:]
-        shift = random.randrange(len(segment))
+        shift = rng.randrange(len(segment))
         return key_no_seg[:shift] + segment + key_no_seg[shift:]
 
     @staticmethod
-    def gen_new_key(key):
-        choice = random.randrange(2)
+    def gen_new_key(key, rng=random):
+        choice = rng.randrange(2)
         transformations = {
             0: ColTrans.swap_two_pos,
             1: ColTrans.segment_slide
         }
-        return transformations[choice](key)
+        return transformations[choice](key, rng)
 
-    @property
-    def best_key(self):
+    def anneal(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
         initial = tuple(
-            random.sample(
+            rng.sample(
                 range(self.guessed_length),
                 k=self.guessed_length
             )
         )
-        print(initial)
-        return simulated_annealing(
-            initial_key=initial,
-            fitness=self.text_fitness,
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        annealer = Annealer(
+            fitness=self.fitness_cache,
             new_key=ColTrans.gen_new_key,
-            # stale_fitness=-10000,
-            # threshold=-10000
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            checkpoint=chain_checkpoint(self.checkpoint, seed, self.seed),
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            schedule=self.schedule,
+            acceptance=self.acceptance
         )
-        pass
+        with measure(self.telemetry, "ColTrans.anneal", self.fitness_cache):
+            key = annealer.start(initial, self.resume)
+        return KeyFit(key, annealer.best_fitness)
+
+    def tabu(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        initial = tuple(
+            rng.sample(
+                range(self.guessed_length),
+                k=self.guessed_length
+            )
+        )
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        search = TabuSearch(
+            fitness=self.fitness_cache,
+            new_key=ColTrans.gen_new_key,
+            samples=30,
+            tenure=self.guessed_length,
+            count=2000,
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng
+        )
+        with measure(self.telemetry, "ColTrans.tabu", self.fitness_cache):
+            key = search.run(initial)
+        return KeyFit(key, search.best_fitness)
+
+    def evolve(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        initial = [
+            tuple(rng.sample(
+                range(self.guessed_length),
+                k=self.guessed_length
+            ))
+            for _ in range(200)
+        ]
+        search = GeneticSearch(
+            batch_fitness=self.batch_fitness(),
+            new_key=ColTrans.gen_new_key,
+            population=200,
+            generations=300,
+            stale=60,
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng
+        )
+        with measure(self.telemetry, "ColTrans.evolve"):
+            key = search.run(initial)
+        return KeyFit(key, search.best_fitness)
+
+    def beam(self, stop=None, seed=None):
+        """
+            Build the key a column at a time, keeping the BEAM_WIDTH
+            partial keys whose rows read best. Appending a column scores
+            the n-grams it ends in every full row: bigrams for the first
+            joins, quadgrams from the fourth column on. The finished
+            keys and their rotations are then scored in full. Once stop()
+            or the deadline hits, the partial keys are finished greedily.
+        """
+        length = self.guessed_length
+        columns, letter = self.column_codes(length)
+        rows = columns.shape[1]
+        models = {n: english_model(n) for n in (2, 4)}
+        deadline = budget_deadline(self.time_limit, self.deadline)
+        partials = np.arange(length)[:, None]
+        scores = np.zeros(length)
+        with measure(self.telemetry, "ColTrans.beam"):
+            for size in range(1, length):
+                n = 4 if size >= 3 else 2
+                prefix = np.zeros((len(partials), rows), dtype=np.intp)
+                valid = np.ones((len(partials), rows), dtype=bool)
+                for column in partials[:, size - n + 1:].T:
+                    prefix = prefix * ENGLISH_LANG_LEN + columns[column]
+                    valid &= letter[column]
+                ngrams = (
+                    prefix[:, None] * ENGLISH_LANG_LEN + columns[None]
+                )
+                gains = np.where(
+                    valid[:, None] & letter[None],
+                    models[n].log_probs[ngrams], 0
+                ).sum(axis=-1, dtype=np.float64)
+                used = np.zeros((len(partials), length), dtype=bool)
+                np.put_along_axis(used, partials, True, axis=1)
+                totals = np.where(used, -math.inf, scores[:, None] + gains)
+                width = ColTrans.BEAM_WIDTH
+                if (stop and stop()) or (
+                    deadline is not None and time.monotonic() >= deadline
+                ):
+                    width = 1
+                best = np.argsort(totals, axis=None)[::-1][:width]
+                best = best[np.isfinite(totals.ravel()[best])]
+                parent, column = np.divmod(best, length)
+                partials = np.column_stack((partials[parent], column))
+                scores = totals[parent, column]
+            keys = [
+                tuple(np.roll(partial, shift).tolist())
+                for partial in partials
+                for shift in range(length)
+            ]
+            fitnesses = self.batch_fitness()(keys)
+        best = int(np.argmax(fitnesses))
+        return KeyFit(keys[best], float(fitnesses[best]))
+
+    def column_codes(self, length: int) -> tuple:
+        """
+            Return the full rows of the kept text as a length x rows
+            array of letter codes, with a mask of which are letters;
+            other kept characters get code 0.
+        """
+        text = self.text.kept(self.keep).lower()
+        rows = len(text) // length
+        columns = np.array([
+            ord(char) - ord("a") if char in english_chars else -1
+            for char in text[:rows * length]
+        ], dtype=np.intp).reshape(rows, length).T
+        letter = columns >= 0
+        return np.where(letter, columns, 0), letter
+
+    def length_scores(self, lengths) -> dict:
+        """
+            Score each key length by how well the columns it gives pair
+            up: every column's best mean bigram log probability with
+            another column along the same rows, leaving out the worst
+            column as the last of the row has no successor. The same
+            score with the second column two rows down, where no pair
+            is adjacent, is taken off as the level chance alone gives.
+        """
+        model = english_model(2)
+
+        def pairing(first, second, first_letter, second_letter):
+            valid = first_letter[:, None] & second_letter[None]
+            log_probs = np.where(valid, model.log_probs[
+                first[:, None] * ENGLISH_LANG_LEN + second[None]
+            ], 0)
+            fitness = log_probs.sum(axis=-1, dtype=np.float64) / np.maximum(
+                valid.sum(axis=-1), 1
+            )
+            np.fill_diagonal(fitness, -math.inf)
+            return np.sort(fitness.max(axis=1))[1:].mean()
+
+        scores = dict()
+        for length in lengths:
+            columns, letter = self.column_codes(length)
+            here, below = columns[:, :-2], columns[:, 2:]
+            here_letter, below_letter = letter[:, :-2], letter[:, 2:]
+            scores[length] = float(
+                pairing(here, here, here_letter, here_letter)
+                - pairing(here, below, here_letter, below_letter)
+            )
+        return scores
+
+    def rank_lengths(self) -> list:
+        """Return the key lengths worth trying, most likely first."""
+        text = self.text.kept(self.keep)
+        lengths = range(2, min(ColTrans.MAX_SEARCH, len(text) // 4 + 1))
+        scores = self.length_scores(lengths)
+        return sorted(lengths, key=scores.get, reverse=True)
+
+    @staticmethod
+    def shortest_key(key: tuple) -> tuple:
+        """Return the shortest key that transposes the same as key."""
+        for length in range(1, len(key)):
+            if len(key) % length == 0 and all(
+                key[i] == key[i % length] + i - i % length
+                for i in range(len(key))
+            ):
+                return key[:length]
+        return key
+
+    def solve_length(self, length: int, deadline=None, stop=None) -> KeyFit:
+        """
+            Search for the best key of length, as a fixed length solver.
+            Given stop, run a single search that ends on stop().
+        """
+        solver = ColTrans(
+            self.text,
+            guessed_length=length,
+            keep=self.keep,
+            workers=1 if stop else self.workers,
+            telemetry=self.telemetry,
+            seed=self.seed,
+            checkpoint=self.checkpoint and "{}.length{}".format(
+                self.checkpoint, length
+            ),
+            resume=self.resume,
+            deadline=deadline,
+            schedule=self.schedule,
+            acceptance=self.acceptance,
+            search=self.search
+        )
+        if stop is None:
+            key = solver.best_key
+        else:
+            key = solver.searches[self.search](stop=stop, seed=self.seed).key
+        return KeyFit(key, english_quadgram_fitness(solver.encipher(key=key)))
+
+    def length_search(self) -> tuple:
+        """
+            Solve the LENGTH_CANDIDATES best ranked key lengths, each in
+            its own worker process of a worker_pool given workers > 1,
+            and return the fittest key found, shortened if it repeats
+            itself. The search ends once a length reaches the English
+            target. A text too short to rank any length gets the
+            identity key (0,).
+        """
+        lengths = self.rank_lengths()[:ColTrans.LENGTH_CANDIDATES]
+        if not lengths:
+            return (0,)
+        deadline = budget_deadline(self.time_limit, self.deadline)
+        results = list()
+        workers = min(self.workers, len(lengths))
+        with worker_pool(workers, self) as (pool, stop):
+            if pool:
+                for key, fitness in pool.imap_unordered(
+                    _solve_length, [(length, deadline) for length in lengths]
+                ):
+                    results.append(KeyFit(key, fitness))
+                    if fitness >= self.target:
+                        stop.set()
+            else:
+                for i, length in enumerate(lengths):
+                    results.append(self.solve_length(
+                        length, share_deadline(deadline, len(lengths) - i)
+                    ))
+                    if results[-1].fitness >= self.target:
+                        break
+        best = max(results, key=lambda elem: elem.fitness)
+        return ColTrans.shortest_key(best.key)
+
+    @property
+    def searches(self) -> dict:
+        return {
+            "anneal": self.anneal,
+            "tabu": self.tabu,
+            "genetic": self.evolve,
+            "beam": self.beam
+        }
+
+    @property
+    def best_key(self):
+        if self.search == "beam":
+            return self.beam().key
+        search = self.searches[self.search]
+        best = best_of_chains(
+            search, self.workers, accept=self.target, seed=self.seed
+        )
+        self.chain_seed = best.seed
+        return best.key
 
     def encipher(self, key: tuple=(), give_key=False, keep=[], pretty=False):
-        text = letters(self.text, keep=self.keep)
+        text = self.text.kept(self.keep)
         if not key:
             if self.key:
                 key = self.key
             else:
                 if self.auto_length:
-                    raise NotImplementedError
+                    key = self.length_search()
+                    self.guessed_length = len(key)
                 else:
                     key = self.best_key
-        split_text = (
-            text[i: i + len(key)]
-            for i in range(0, len(text), len(key))
-        )
-        enciphered = "".join(
-            self.permute(split, key)
-            for split in split_text
-        )
+                self.key = key
+        enciphered = Transposition.columnar(len(text), key).apply(text)
         if pretty:
             enciphered = match(self.text, enciphered)
         if give_key:
@@ -1052,31 +3183,67 @@ class ScyColTrans:
     )
     MAX_SEARCH = 7
 
-    def __init__(self, text, scy_key: int=1, col_key: tuple=()):
-        self.text = text
+    def __init__(
+        self,
+        text,
+        scy_key: int=1,
+        col_key: tuple=(),
+        time_limit=None,
+        deadline=None,
+        workers=1,
+        seed=None
+    ):
+        self.text = CipherText.of(text)
         self.scy_key = scy_key
         self.col_key = col_key
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.workers = workers
+        self.seed = new_seed() if seed is None else seed
         self.auto_scy = scy_key == 1
         self.auto_col = not bool(col_key)
         self.key = ScyColTrans.Key(self.scy_key, self.col_key)
 
+    @staticmethod
+    def transposition(length: int, key) -> Transposition:
+        """Compile the Scytale and then ColTrans of key into one gather."""
+        return Transposition.scytale(length, key.scytale).then(
+            Transposition.columnar(length, key.columnar)
+        )
+
     def encipher(self, give_key=False, pretty=False):
+        deadline = budget_deadline(self.time_limit, self.deadline)
+        text = self.text.stripped
         if self.auto_scy and self.auto_col:
-            possible_texts = list()
+            candidates = list()
+            searches = ScyColTrans.MAX_SEARCH - 2
             for pos_scy_key in range(2, ScyColTrans.MAX_SEARCH):
-                for pos_len in range(2, ScyColTrans.MAX_SEARCH):
-                    pos_text = Scytale(self.text, key=pos_scy_key).encipher()
-                    best_from_key = ColTrans(
-                        pos_text, guessed_length=pos_len
-                    ).encipher(give_key=True)
-                    possible_texts.append(
-                        ScyColTrans.TextScyColFit(
-                            text=best_from_key.text,
-                            scytale=pos_scy_key,
-                            columnar=best_from_key.key,
-                            fitness=english_quadgram_fitness(best_from_key.text)
-                        )
+                pos_text = Transposition.scytale(
+                    len(text), pos_scy_key
+                ).apply(text)
+                best_from_key = ColTrans(
+                    pos_text,
+                    workers=self.workers,
+                    seed=self.seed + pos_scy_key,
+                    deadline=share_deadline(
+                        deadline, searches - len(candidates)
                     )
+                ).encipher(give_key=True)
+                candidates.append((pos_scy_key, best_from_key))
+            fitnesses = english_quadgram_model().score_ragged(list(
+                encode(best_from_key.text)
+                for pos_scy_key, best_from_key in candidates
+            ))
+            possible_texts = list(
+                ScyColTrans.TextScyColFit(
+                    text=best_from_key.text,
+                    scytale=pos_scy_key,
+                    columnar=best_from_key.key,
+                    fitness=fitness
+                )
+                for (pos_scy_key, best_from_key), fitness
+                in zip(candidates, fitnesses)
+            )
             best = sorted(
                 possible_texts,
                 key=lambda elem: elem.fitness,
@@ -1088,26 +3255,38 @@ class ScyColTrans:
                 columnar=best.columnar
             )
         elif self.auto_col:
-            text = Scytale(self.text, key=self.scy_key).encipher()
-            best = ColTrans(text).encipher(give_key=True)
+            best = ColTrans(
+                Transposition.scytale(len(text), self.scy_key).apply(text),
+                workers=self.workers,
+                seed=self.seed + self.scy_key,
+                deadline=deadline
+            ).encipher(give_key=True)
             enciphered = best.text
             self.key = ScyColTrans.Key(
                 scytale=self.scy_key,
                 columnar=best.key
             )
         elif self.auto_scy:
-            possible_texts = list()
-            for pos_scy_key in range(2, ScyColTrans.MAX_SEARCH):
-                pos_text = Scytale(self.text, key=pos_scy_key).encipher()
-                column_text = ColTrans(pos_text, key=self.col_key).encipher()
-                possible_texts.append(
-                    ScyColTrans.TextScyColFit(
-                        text=column_text,
-                        scytale=pos_scy_key,
-                        columnar=self.col_key,
-                        fitness=english_quadgram_fitness(column_text)
-                    )
+            column_texts = list(
+                ScyColTrans.transposition(
+                    len(text), ScyColTrans.Key(pos_scy_key, self.col_key)
+                ).apply(text)
+                for pos_scy_key in range(2, ScyColTrans.MAX_SEARCH)
+            )
+            fitnesses = english_quadgram_model().score_ragged(list(
+                encode(column_text) for column_text in column_texts
+            ))
+            possible_texts = list(
+                ScyColTrans.TextScyColFit(
+                    text=column_text,
+                    scytale=pos_scy_key,
+                    columnar=self.col_key,
+                    fitness=fitness
+                )
+                for pos_scy_key, column_text, fitness in zip(
+                    range(2, ScyColTrans.MAX_SEARCH), column_texts, fitnesses
                 )
+            )
             best = sorted(
                 possible_texts,
                 key=lambda elem: elem.fitness,
@@ -1119,8 +3298,9 @@ class ScyColTrans:
                 columnar=self.col_key
             )
         else:
-            scytale = Scytale(self.text, key=self.scy_key).encipher()
-            enciphered = ColTrans(scytale, key=self.col_key).encipher()
+            enciphered = ScyColTrans.transposition(
+                len(text), self.key
+            ).apply(text)
         if pretty:
             enciphered = match(self.text, enciphered)
         if give_key:
@@ -1138,10 +3318,36 @@ class Bifid:
     )
     MAX_SEARCH = 7
 
-    def __init__(self, text, period: int=1, key: str=""):
-        self.text = text
+    def __init__(
+        self,
+        text,
+        period: int=1,
+        key: str="",
+        workers=1,
+        telemetry=None,
+        seed=None,
+        checkpoint=None,
+        resume=False,
+        time_limit=None,
+        deadline=None,
+        schedule=linear_cooling,
+        acceptance=None,
+        search="anneal"
+    ):
+        self.text = CipherText.of(text)
         self.period = period
         self.key = key
+        self.workers = workers
+        self.telemetry = telemetry
+        self.seed = new_seed() if seed is None else seed
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.schedule = schedule
+        self.acceptance = acceptance
+        self.search = search
+        self.target = english_target(len(self.text.stripped))
         self.auto_period = period < 2
         self.auto_key = not bool(key)
 
@@ -1193,34 +3399,166 @@ class Bifid:
             )
         return key_fitness
 
+    @property
+    def delta_fitness(self):
+        """Key fitness that only rescores letters touched by a key change."""
+        return self.ngram_fitness()
+
+    def sources(self) -> tuple:
+        """
+            For each plaintext letter, return which cipher letters give
+            its row and column coordinates and whether each coordinate
+            is that letter's column rather than its row.
+        """
+        cipher = self.text.encoded
+        sources = list()
+        for start in range(0, len(cipher), self.period):
+            length = min(self.period, len(cipher) - start)
+            for offset in range(length):
+                sources.append((
+                    start + offset // 2, offset % 2,
+                    start + (length + offset) // 2, (length + offset) % 2
+                ))
+        return tuple(
+            np.array(column, dtype=np.intp) for column in zip(*sources)
+        ) if sources else (np.empty(0, dtype=np.intp),) * 4
+
+    def ngram_fitness(self, n: int=4):
+        """Return a delta key fitness scored with the english n-gram model."""
+        cipher = self.text.encoded
+        row_source, row_is_col, col_source, col_is_col = self.sources()
+        alphabet = np.arange(ENGLISH_LANG_LEN)[:, None]
+        dependents = (
+            (cipher[row_source] == alphabet) | (cipher[col_source] == alphabet)
+        )
+        state = dict()
+
+        def decrypt(key, positions=None):
+            if positions is None:
+                positions = np.arange(len(cipher))
+                state["square"] = np.empty(len(cipher), dtype=np.intp)
+            where = square_positions(key)
+            row = where[cipher[row_source[positions]]]
+            col = where[cipher[col_source[positions]]]
+            row = np.where(row_is_col[positions], row % 5, row // 5)
+            col = np.where(col_is_col[positions], col % 5, col // 5)
+            state["square"][positions] = row * 5 + col
+            return encode(key)[row * 5 + col]
+
+        def changed(old_key, key):
+            old_square, square = encode(old_key), encode(key)
+            moved = old_square != square
+            swapped = np.zeros(ENGLISH_LANG_LEN, dtype=bool)
+            swapped[old_square[moved]] = True
+            swapped[square[moved]] = True
+            return np.flatnonzero(
+                moved[state["square"]] | dependents[swapped].any(axis=0)
+            )
+
+        return DeltaFitness(decrypt, changed, english_model(n))
+
+    def batch_fitness(self, n: int=4):
+        """Return a fitness scoring a list of keys at once."""
+        cipher = self.text.encoded
+        row_source, row_is_col, col_source, col_is_col = self.sources()
+        model = english_model(n)
+
+        def fitness(keys):
+            where = np.array([square_positions(key) for key in keys])
+            squares = np.array([encode(key) for key in keys])
+            rows = np.arange(len(keys))[:, None]
+            row = where[rows, cipher[row_source]]
+            col = where[rows, cipher[col_source]]
+            row = np.where(row_is_col, row % 5, row // 5)
+            col = np.where(col_is_col, col % 5, col // 5)
+            return model.score_batch(squares[rows, row * 5 + col])
+
+        return fitness
+
     @staticmethod
-    def gen_new_key(key):
-        (swap_1, swap_2) = tuple(random.choices(range(25), k=2))
+    def gen_new_key(key, rng=random):
+        (swap_1, swap_2) = tuple(rng.choices(range(25), k=2))
         new_key = list(key)
         new_key[swap_1], new_key[swap_2] = new_key[swap_2], new_key[swap_1]
         return "".join(new_key)
 
-    def best_key(self):
-        return simulated_annealing(
-            initial_key=Bifid.ALPHABET_NO_J,
-            fitness=self.text_fitness,
+    def anneal(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        annealer = Annealer(
+            fitness=self.fitness_cache,
             new_key=self.gen_new_key,
             count=10000,
-            initial_temp=70
+            initial_temp=70,
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            checkpoint=chain_checkpoint(self.checkpoint, seed, self.seed),
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            schedule=self.schedule,
+            acceptance=self.acceptance
         )
+        with measure(self.telemetry, "Bifid.anneal", self.fitness_cache):
+            key = annealer.start(Bifid.ALPHABET_NO_J, self.resume)
+        return KeyFit(key, annealer.best_fitness)
+
+    def evolve(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        search = GeneticSearch(
+            batch_fitness=self.batch_fitness(),
+            new_key=Bifid.gen_new_key,
+            population=300,
+            elite=20,
+            generations=2000,
+            stale=300,
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng
+        )
+        initial = [
+            "".join(rng.sample(Bifid.ALPHABET_NO_J, k=25))
+            for _ in range(search.population)
+        ]
+        with measure(self.telemetry, "Bifid.evolve"):
+            key = search.run(initial)
+        return KeyFit(key, search.best_fitness)
+
+    def best_key(self):
+        search = self.evolve if self.search == "genetic" else self.anneal
+        best = best_of_chains(
+            search, self.workers, accept=self.target, seed=self.seed
+        )
+        self.chain_seed = best.seed
+        return best.key
 
     def encipher(self, key="", give_key=False, pretty=False):
-        text = letters(self.text).lower()
+        text = self.text.stripped
         if not key and self.auto_key:
             # First of all, see if we also have to search for a period
             if self.auto_period:
                 possible_texts = list()
+                deadline = budget_deadline(self.time_limit, self.deadline)
                 for possible_period in range(2, Bifid.MAX_SEARCH):
                     print("Testing period: ", possible_period)
-                    time.sleep(3)
                     possible_text = Bifid(
                         self.text,
-                        period=possible_period
+                        period=possible_period,
+                        workers=self.workers,
+                        telemetry=self.telemetry,
+                        seed=self.seed,
+                        checkpoint=self.checkpoint and "{}.period{}".format(
+                            self.checkpoint, possible_period
+                        ),
+                        resume=self.resume,
+                        deadline=share_deadline(
+                            deadline, Bifid.MAX_SEARCH - possible_period
+                        ),
+                        schedule=self.schedule,
+                        acceptance=self.acceptance,
+                        search=self.search
                     ).encipher(give_key=True)
                     possible_texts.append(
                         Bifid.TextFitKeyPer(
@@ -1261,9 +3599,37 @@ class Bifid:
 class Playfair:
     ALPHABET_NO_J = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
 
-    def __init__(self, text: str, key: str=""):
-        self.text = text
+    def __init__(
+        self,
+        text: str,
+        key: str="",
+        workers=1,
+        search: str="anneal",
+        telemetry=None,
+        seed=None,
+        checkpoint=None,
+        resume=False,
+        time_limit=None,
+        deadline=None,
+        schedule=linear_cooling,
+        acceptance=None
+    ):
+        self.text = CipherText.of(text)
         self.key = key
+        self.workers = workers
+        self.telemetry = telemetry
+        self.seed = new_seed() if seed is None else seed
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.schedule = schedule
+        self.acceptance = acceptance
+        self.target = english_target(len(self.text.stripped))
+        self.restart_fitness = english_target(
+            len(self.text.stripped), RESTART_CONFIDENCE
+        )
+        self.search = search
 
     @staticmethod
     def bigram_crypt(bigram, key):
@@ -1315,20 +3681,105 @@ class Playfair:
     def text_fitness(self):
         def key_fitness(key):
             return english_quadgram_fitness(
-                self.encipher(key=key)
+                self.encipher(key=key, formatted=False)
             )
         return key_fitness
 
+    @property
+    def delta_fitness(self):
+        """Key fitness that only rescores bigrams touched by a key change."""
+        return self.ngram_fitness()
+
+    def ngram_fitness(self, n: int=4):
+        """Return a delta key fitness scored with the english n-gram model."""
+        cipher = self.text.encoded
+        cipher = cipher[:len(cipher) - len(cipher) % 2].astype(np.intp)
+        first = cipher[0::2].repeat(2)
+        second = cipher[1::2].repeat(2)
+        alphabet = np.arange(ENGLISH_LANG_LEN)[:, None]
+        dependents = (first == alphabet) | (second == alphabet)
+        state = dict()
+
+        def decrypt(key, positions=None):
+            if positions is None:
+                positions = np.arange(len(cipher))
+                state["square"] = np.empty(len(cipher), dtype=np.intp)
+            where = square_positions(key)
+            pos_0 = where[first[positions]]
+            pos_1 = where[second[positions]]
+            row_0, col_0 = pos_0 // 5, pos_0 % 5
+            row_1, col_1 = pos_1 // 5, pos_1 % 5
+            is_second = positions % 2 == 1
+            same_rows = row_0 == row_1
+            same_cols = (col_0 == col_1) & ~same_rows
+            row = np.where(is_second, row_1, row_0)
+            col = np.where(is_second, col_0, col_1)
+            col = np.where(
+                same_rows, (np.where(is_second, col_1, col_0) - 1) % 5, col
+            )
+            row = np.where(same_cols, (row - 1) % 5, row)
+            state["square"][positions] = row * 5 + col
+            return encode(key)[row * 5 + col]
+
+        def changed(old_key, key):
+            old_square, square = encode(old_key), encode(key)
+            moved = old_square != square
+            swapped = np.zeros(ENGLISH_LANG_LEN, dtype=bool)
+            swapped[old_square[moved]] = True
+            swapped[square[moved]] = True
+            return np.flatnonzero(
+                moved[state["square"]] | dependents[swapped].any(axis=0)
+            )
+
+        return DeltaFitness(decrypt, changed, english_model(n))
+
+    def batch_fitness(self, n: int=4):
+        """Return a fitness scoring a list of keys at once."""
+        # Each bigram deciphers on its own, so only the distinct
+        # bigrams of the text are worked out for every key.
+        cipher = self.text.encoded
+        cipher = cipher[:len(cipher) - len(cipher) % 2].astype(np.intp)
+        bigrams, inverse = np.unique(
+            cipher[0::2] * ENGLISH_LANG_LEN + cipher[1::2],
+            return_inverse=True
+        )
+        first, second = np.divmod(bigrams, ENGLISH_LANG_LEN)
+        model = english_model(n)
+
+        def fitness(keys):
+            where = np.array([square_positions(key) for key in keys])
+            squares = np.array([encode(key) for key in keys])
+            rows = np.arange(len(keys))[:, None]
+            row_0, col_0 = np.divmod(where[rows, first], 5)
+            row_1, col_1 = np.divmod(where[rows, second], 5)
+            same_rows = row_0 == row_1
+            same_cols = (col_0 == col_1) & ~same_rows
+            col_0, col_1 = (
+                np.where(same_rows, (col_0 - 1) % 5, col_1),
+                np.where(same_rows, (col_1 - 1) % 5, col_0)
+            )
+            row_0 = np.where(same_cols, (row_0 - 1) % 5, row_0)
+            row_1 = np.where(same_cols, (row_1 - 1) % 5, row_1)
+            plain = np.stack((
+                squares[rows, row_0 * 5 + col_0],
+                squares[rows, row_1 * 5 + col_1]
+            ), axis=-1)
+            return model.score_batch(
+                plain[:, inverse].reshape(len(keys), -1)
+            )
+
+        return fitness
+
     @staticmethod
-    def exchange_letters(key):
-        (swap_1, swap_2) = tuple(random.choices(range(25), k=2))
+    def exchange_letters(key, rng=random):
+        (swap_1, swap_2) = tuple(rng.choices(range(25), k=2))
         new_key = list(key)
         new_key[swap_1], new_key[swap_2] = new_key[swap_2], new_key[swap_1]
         return "".join(new_key)
 
     @staticmethod
-    def exchange_rows(key):
-        (swap_1, swap_2) = tuple(random.choices(range(5), k=2))
+    def exchange_rows(key, rng=random):
+        (swap_1, swap_2) = tuple(rng.choices(range(5), k=2))
         new_key = list(chunked(key, 5))
         new_key[swap_1], new_key[swap_2] = new_key[swap_2], new_key[swap_1]
         return "".join(new_key)
@@ -1339,8 +3790,8 @@ class Playfair:
         return "".join(reversed(new_key))
 
     @staticmethod
-    def exchange_cols(key):
-        (swap_1, swap_2) = tuple(random.choices(range(5), k=2))
+    def exchange_cols(key, rng=random):
+        (swap_1, swap_2) = tuple(rng.choices(range(5), k=2))
         new_key = list(
             key[offset::5]
             for offset in range(5)
@@ -1369,42 +3820,119 @@ class Playfair:
         return "".join(reversed(key))
 
     @staticmethod
-    def gen_new_key(key):
-        choice = random.randint(0, 8)
+    def random_key(key=None, rng=random):
+        """Return a random key square."""
+        return "".join(rng.sample(Playfair.ALPHABET_NO_J, k=25))
+
+    @staticmethod
+    def gen_new_key(key, rng=random):
+        choice = rng.randint(0, 8)
         if choice == 8:
-            choice = random.randint(1, 5)
+            choice = rng.randint(1, 5)
         else:
             choice = 0
         transformations = {
-            0: Playfair.exchange_letters,
-            1: Playfair.exchange_rows,
-            2: Playfair.exchange_cols,
+            0: functools.partial(Playfair.exchange_letters, rng=rng),
+            1: functools.partial(Playfair.exchange_rows, rng=rng),
+            2: functools.partial(Playfair.exchange_cols, rng=rng),
             3: Playfair.flip_left_right,
             4: Playfair.flip_top_bottom,
             5: Playfair.key_reverse
         }
         return transformations[choice](key)
 
-    @property
-    def best_key(self):
-        return simulated_annealing(
-            initial_key="".join(random.sample(Playfair.ALPHABET_NO_J, k=25)),
-            fitness=self.text_fitness,
+    def anneal(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        annealer = Annealer(
+            fitness=self.fitness_cache,
             new_key=Playfair.gen_new_key,
             initial_temp=80,
             count=20000,
             max_length=10000,
-            stale=10000,
-            stale_fitness=-34000
+            threshold=self.restart_fitness,
+            restart=Playfair.random_key,
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            checkpoint=chain_checkpoint(self.checkpoint, seed, self.seed),
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            schedule=self.schedule,
+            acceptance=self.acceptance
+        )
+        initial = Playfair.random_key(rng=rng)
+        with measure(self.telemetry, "Playfair.anneal", self.fitness_cache):
+            key = annealer.start(initial, self.resume)
+        return KeyFit(key, annealer.best_fitness)
+
+    def temper(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        self.fitness_cache = FitnessCache(self.delta_fitness)
+        tempering = ParallelTempering(
+            fitness=self.fitness_cache,
+            new_key=Playfair.gen_new_key,
+            temps=geometric_temperatures(15, 120, 6),
+            rounds=150,
+            steps=100,
+            workers=self.workers,
+            threshold=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            deadline=budget_deadline(self.time_limit, self.deadline)
+        )
+        initial = [
+            "".join(rng.sample(Playfair.ALPHABET_NO_J, k=25))
+            for temp in tempering.temps
+        ]
+        with measure(self.telemetry, "Playfair.temper", self.fitness_cache):
+            key = tempering.run(initial)
+        return KeyFit(key, tempering.best_fitness)
+
+    def evolve(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        search = GeneticSearch(
+            batch_fitness=self.batch_fitness(),
+            new_key=Playfair.gen_new_key,
+            population=300,
+            elite=20,
+            generations=2000,
+            stale=300,
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng
         )
+        initial = [
+            "".join(rng.sample(Playfair.ALPHABET_NO_J, k=25))
+            for _ in range(search.population)
+        ]
+        with measure(self.telemetry, "Playfair.evolve"):
+            key = search.run(initial)
+        return KeyFit(key, search.best_fitness)
 
-    def encipher(self, key: str="", give_key=False, pretty=False):
+    @property
+    def best_key(self):
+        if self.search == "temper":
+            return self.temper().key
+        search = self.evolve if self.search == "genetic" else self.anneal
+        best = best_of_chains(
+            search, self.workers, accept=self.target, seed=self.seed
+        )
+        self.chain_seed = best.seed
+        return best.key
+
+    def encipher(
+        self, key: str="", give_key=False, pretty=False, formatted=True
+    ):
         if not key:
             if self.key:
                 key = self.key
             else:
                 key = self.best_key
-        text = letters(self.text).lower()
+        text = self.text.stripped
         split_text = chunked(text, 2)
         enciphered = "".join(
             self.bigram_crypt(bigram, key)
@@ -1412,20 +3940,51 @@ class Playfair:
         )
         if pretty:
             enciphered = Playfair.normalise(enciphered)
+        if formatted:
+            enciphered = match(self.text, enciphered)
         if give_key:
-            return TextKey(match(self.text, enciphered), key)
+            return TextKey(enciphered, key)
         else:
-            return match(self.text, enciphered)
+            return enciphered
 
 
 class Foursquare:
     ALPHABET_NO_J = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
     alphabet = ALPHABET_NO_J.lower()
 
-    def __init__(self, text, key1="", key2=""):
-        self.text = text
+    def __init__(
+        self,
+        text,
+        key1="",
+        key2="",
+        workers=1,
+        search="anneal",
+        telemetry=None,
+        seed=None,
+        checkpoint=None,
+        resume=False,
+        time_limit=None,
+        deadline=None,
+        schedule=linear_cooling,
+        acceptance=None
+    ):
+        self.text = CipherText.of(text)
         self.key1 = key1
         self.key2 = key2
+        self.workers = workers
+        self.telemetry = telemetry
+        self.seed = new_seed() if seed is None else seed
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.time_limit = time_limit
+        self.deadline = deadline
+        self.schedule = schedule
+        self.acceptance = acceptance
+        self.target = english_target(len(self.text.stripped))
+        self.restart_fitness = english_target(
+            len(self.text.stripped), RESTART_CONFIDENCE
+        )
+        self.search = search
 
     @staticmethod
     def bigram_crypt(bigram, key1, key2):
@@ -1464,29 +4023,85 @@ class Foursquare:
         return key_fitness
 
     @staticmethod
-    def gen_new_key(key):
-        key_to_change = random.randint(0, 1)
+    def gen_new_key(key, rng=random):
+        key_to_change = rng.randint(0, 1)
         new_key = list(key)
-        new_key[key_to_change] = Playfair.gen_new_key(new_key[key_to_change])
+        new_key[key_to_change] = Playfair.gen_new_key(
+            new_key[key_to_change], rng
+        )
         return new_key
 
-    @property
-    def best_key(self):
-        initial = [
-            "".join(random.sample(Foursquare.ALPHABET_NO_J, k=25)),
-            "".join(random.sample(Foursquare.ALPHABET_NO_J, k=25))
+    @staticmethod
+    def random_key(key=None, rng=random):
+        """Return a pair of random key squares."""
+        return [
+            Playfair.random_key(rng=rng),
+            Playfair.random_key(rng=rng)
         ]
-        return simulated_annealing(
-            initial_key=initial,
-            fitness=self.text_fitness,
+
+    def anneal(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        initial = Foursquare.random_key(rng=rng)
+        self.fitness_cache = FitnessCache(self.text_fitness)
+        annealer = Annealer(
+            fitness=self.fitness_cache,
             new_key=Foursquare.gen_new_key,
             initial_temp=30,
             count=20000,
             max_length=10000,
             stale=10000,
-            stale_fitness=-11000,
-            threshold=-11000
+            stale_fitness=self.restart_fitness,
+            threshold=self.restart_fitness,
+            restart=Foursquare.random_key,
+            target=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            checkpoint=chain_checkpoint(self.checkpoint, seed, self.seed),
+            deadline=budget_deadline(self.time_limit, self.deadline),
+            schedule=self.schedule,
+            acceptance=self.acceptance
+        )
+        with measure(self.telemetry, "Foursquare.anneal", self.fitness_cache):
+            key = annealer.start(initial, self.resume)
+        return KeyFit(key, annealer.best_fitness)
+
+    def temper(self, stop=None, seed=None):
+        rng = random.Random(self.seed if seed is None else seed)
+        self.fitness_cache = FitnessCache(self.text_fitness)
+        tempering = ParallelTempering(
+            fitness=self.fitness_cache,
+            new_key=Foursquare.gen_new_key,
+            temps=geometric_temperatures(10, 80, 6),
+            rounds=150,
+            steps=100,
+            workers=self.workers,
+            threshold=self.target,
+            report=self.telemetry,
+            stop=stop,
+            rng=rng,
+            deadline=budget_deadline(self.time_limit, self.deadline)
+        )
+        initial = [
+            [
+                "".join(rng.sample(Foursquare.ALPHABET_NO_J, k=25)),
+                "".join(rng.sample(Foursquare.ALPHABET_NO_J, k=25))
+            ]
+            for temp in tempering.temps
+        ]
+        with measure(self.telemetry, "Foursquare.temper", self.fitness_cache):
+            key = tempering.run(initial)
+        return KeyFit(key, tempering.best_fitness)
+
+    @property
+    def best_key(self):
+        if self.search == "temper":
+            return self.temper().key
+        best = best_of_chains(
+            self.anneal, self.workers, accept=self.target, seed=self.seed
         )
+        self.chain_seed = best.seed
+        return best.key
 
     def encipher(self, key1="", key2="", give_key=False, pretty=False):
         if not key1:
@@ -1496,7 +4111,7 @@ class Foursquare:
             else:
                 best = self.best_key
                 key1, key2 = best[0], best[1]
-        text = letters(self.text).lower()
+        text = self.text.stripped
         split_text = chunked(text, 2)
         enciphered = "".join(
             self.bigram_crypt(bigram, key1, key2)
@@ -1514,14 +4129,13 @@ class Foursquare:
 
 class Hill:
     MAX_SEARCH = 5
-    ChiMat = collections.namedtuple('ChiMatrix', ['chi', 'matrix'])
     FitMat = collections.namedtuple('FitnessMatrix', ['fitness', 'matrix'])
     TextFitKey = collections.namedtuple(
         'TextFitnessKey',
         ['text', 'fitness', 'key'])
 
     def __init__(self, text, size: int=1, key: list=[]):
-        self.text = text
+        self.text = CipherText.of(text)
         if key:
             top, bottom = key
             self.key = np.matrix(key)
@@ -1533,53 +4147,24 @@ class Hill:
 
     @property
     def matrix_text(self):
-        text = letters(self.text).lower()
-        split_text = (
-            text[i: i + self.size]
-            for i in range(0, len(text), self.size)
-        )
         return np.matrix(
-            list(
-                list(
-                    english_chars.index(char)
-                    for char in split
-                )
-                for split in split_text
-            )
+            self.text.encoded.reshape(-1, self.size).astype(int)
         ).transpose()
 
     @property
     def best_rows(self):
-        text = letters(self.text).lower()
-        possible_matrices = list()
-        for row in itertools.product(
+        rows = np.array(list(itertools.product(
             range(ENGLISH_LANG_LEN),
             repeat=self.size
-        ):
-            # common = math.gcd(*row)
-            row = list(row)
-            common = functools.reduce(math.gcd, row)
-            if math.gcd(common, ENGLISH_LANG_LEN) != 1:
-                continue
-            possible_matrix = np.matrix([*row])
-            possible_text = "".join(
-                english_chars[value % ENGLISH_LANG_LEN]
-                for value in (
-                    possible_matrix * self.matrix_text
-                ).tolist()[0]
-            )
-            possible_matrices.append(
-                Hill.ChiMat(
-                    chi=english_1gram_chi(possible_text),
-                    matrix=possible_matrix
-                )
-            )
+        )))
+        common = np.gcd.reduce(rows, axis=1)
+        rows = rows[np.gcd(common, ENGLISH_LANG_LEN) == 1]
+        chis = english_1gram_chi_batch(
+            rows @ np.asarray(self.matrix_text) % ENGLISH_LANG_LEN
+        )
         return list(
-            best.matrix
-            for best in sorted(
-                possible_matrices,
-                key=lambda elem: elem.chi
-            )[:self.size]
+            np.matrix(row)
+            for row in rows[np.argsort(chis, kind="stable")[:self.size]]
         )
 
     @property
@@ -1591,7 +4176,7 @@ class Hill:
         possible_texts = list()
         for item in itertools.permutations(best_rows, self.size):
             possible_matrix = np.matrix(list(item))
-            possible_text = self.encipher(key=possible_matrix)
+            possible_text = self.encipher(key=possible_matrix, formatted=False)
             possible_texts.append(
                 Hill.FitMat(
                     fitness=english_quadgram_fitness(possible_text),
@@ -1604,14 +4189,14 @@ class Hill:
             reverse=True
         )[0].matrix
 
-    def encipher(self, key=None, give_key=False):
+    def encipher(self, key=None, give_key=False, formatted=True):
         if key is None:
             if hasattr(self, 'key'):
                 key = self.key
             elif self.auto:
                 possible_texts = list()
                 for possible_size in range(2, Hill.MAX_SEARCH):
-                    if len(letters(self.text).lower()) % possible_size != 0:
+                    if len(self.text.stripped) % possible_size != 0:
                         continue
                     possible = Hill(
                         self.text,
@@ -1640,10 +4225,12 @@ class Hill:
             )
             for row in encoded.transpose()
         )
+        if formatted:
+            enciphered = match(self.text, enciphered)
         if give_key:
-            return TextKey(match(self.text, enciphered), key)
+            return TextKey(enciphered, key)
         else:
-            return match(self.text, enciphered)
+            return enciphered
 
 
 class Challenge2004:
@@ -0,0 +1,94 @@
+import argparse
+from cipher_decryption import (
+    SCHEDULES,
+    AutoKey,
+    Bifid,
+    ColTrans,
+    Foursquare,
+    Playfair,
+    english_confidence,
+    english_quadgram_fitness
+)
+
+
+def solver(args, text):
+    """Build the annealing solver named by args.cipher for text."""
+    options = dict(
+        workers=args.workers,
+        seed=args.seed,
+        checkpoint=args.checkpoint,
+        resume=args.resume,
+        time_limit=args.time_limit,
+        schedule=SCHEDULES[args.schedule],
+        acceptance=args.acceptance
+    )
+    if args.cipher == "autokey":
+        return AutoKey(text, size=args.size, **options)
+    if args.cipher == "coltrans":
+        return ColTrans(text, guessed_length=args.size, **options)
+    if args.cipher == "bifid":
+        return Bifid(text, period=args.size, **options)
+    if args.cipher == "playfair":
+        return Playfair(text, **options)
+    return Foursquare(text, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Break a ciphertext file with an annealing solver."
+    )
+    parser.add_argument(
+        "cipher",
+        choices=["autokey", "coltrans", "bifid", "playfair", "foursquare"]
+    )
+    parser.add_argument("path", help="file holding the ciphertext")
+    parser.add_argument(
+        "--size", type=int, default=1,
+        help="AutoKey primer length, ColTrans key length or Bifid period; "
+        "ColTrans and Bifid search for it when left at 1"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="seed to replay a run; a fresh one is printed otherwise"
+    )
+    parser.add_argument(
+        "--checkpoint", default=None,
+        help="save the annealing state to this file as the run goes"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="carry on from --checkpoint if it exists; parallel runs "
+        "also need their original --seed"
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=None,
+        help="seconds to search before returning the best key so far"
+    )
+    parser.add_argument(
+        "--schedule", choices=sorted(SCHEDULES), default="linear"
+    )
+    parser.add_argument(
+        "--acceptance", type=float, default=None,
+        help="calibrate the starting temperature to accept this share "
+        "of worsening moves (about 0.25), instead of the hand-tuned one"
+    )
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+
+    with open(args.path) as f:
+        text = f.read()
+    cipher = solver(args, text)
+    print("seed:", cipher.seed)
+    solution = cipher.encipher(give_key=True)
+    print("key:", solution.key)
+    print("english confidence: {:.3f}".format(english_confidence(
+        english_quadgram_fitness(solution.text),
+        len(cipher.text.stripped)
+    )))
+    print(solution.text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import functools
+import random
+
+import numpy as np
+import pytest
+
+import cipher_texts
+from cipher_decryption import (
+    Bifid,
+    ColTrans,
+    DeltaScorer,
+    MonoSub,
+    Playfair,
+    encode,
+    english_quadgram_model,
+    letters
+)
+
+STEPS = 300
+
+
+def assert_matches_rescoring(solver, key, new_key, steps=STEPS):
+    """Walk a chain of keys, checking delta scores against full ones."""
+    rng = random.Random(0)
+    delta = solver.delta_fitness
+    full = solver.text_fitness
+    for _ in range(steps):
+        assert delta(key) == pytest.approx(full(key), abs=1e-3)
+        key = new_key(key, rng)
+
+
+def test_delta_scorer_windows_at_the_edges():
+    plain = encode(letters(cipher_texts.Test.playfair_encrypted))[:50]
+    scorer = DeltaScorer(plain)
+    positions = np.array([0, 1, 25, 48, 49])
+    values = np.array([3, 7, 11, 0, 25])
+    fitness = scorer.update(positions, values)
+    plain = plain.astype(np.intp)
+    plain[positions] = values
+    assert fitness == pytest.approx(
+        english_quadgram_model().score(plain), abs=1e-3
+    )
+
+
+def test_monosub_delta_matches_rescoring():
+    solver = MonoSub(cipher_texts.Challenge2018.encrypted_text_3B)
+    assert_matches_rescoring(
+        solver,
+        solver.prob_key,
+        functools.partial(MonoSub.kick_key, swaps=1)
+    )
+
+
+def test_monosub_neighbour_sweep_matches_rescoring():
+    solver = MonoSub(cipher_texts.Challenge2018.encrypted_text_3B)
+    delta = solver.delta_fitness
+    full = solver.text_fitness
+    for key in MonoSub.gen_neigbors_key(solver.prob_key):
+        assert delta(key) == pytest.approx(full(key), abs=1e-3)
+
+
+@pytest.mark.parametrize("length", [5, 7, 11])
+def test_coltrans_delta_matches_rescoring(length):
+    solver = ColTrans(
+        cipher_texts.Challenge2018.encrypted_text_6B, guessed_length=length
+    )
+    assert_matches_rescoring(
+        solver, tuple(range(length)), ColTrans.gen_new_key
+    )
+
+
+def test_playfair_delta_matches_rescoring():
+    solver = Playfair(cipher_texts.Test.playfair_encrypted)
+    assert_matches_rescoring(
+        solver,
+        Playfair.random_key(rng=random.Random(1)),
+        Playfair.gen_new_key
+    )
+
+
+@pytest.mark.parametrize("period", [4, 5])
+def test_bifid_delta_matches_rescoring(period):
+    solver = Bifid(cipher_texts.Challenge2016.encrypted_text_7B, period=period)
+    assert_matches_rescoring(
+        solver,
+        "".join(random.Random(1).sample(Bifid.ALPHABET_NO_J, 25)),
+        Bifid.gen_new_key
+    )
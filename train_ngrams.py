@@ -0,0 +1,72 @@
+import argparse
+import os
+import cipher_decryption
+from cipher_decryption import MODEL_DIR, NgramCounter, calibrate
+
+
+def challenge_plaintexts():
+    """Yield every solved Challenge20xx plaintext."""
+    for name in dir(cipher_decryption):
+        if not name.startswith("Challenge"):
+            continue
+        challenge = vars(getattr(cipher_decryption, name))
+        for attribute, value in challenge.items():
+            if attribute.startswith("solution") and isinstance(value, str):
+                yield value
+
+
+def english_plaintexts():
+    """
+        Yield the Challenge20xx plaintexts that are English throughout,
+        leaving out 2017 5A, half of which is a W/B binary block.
+    """
+    binary = cipher_decryption.Challenge2017.solution_5A
+    for plaintext in challenge_plaintexts():
+        if plaintext is not binary:
+            yield plaintext
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Count n-grams over a corpus and write .npy models."
+    )
+    parser.add_argument("corpus", nargs="*", help="text files to stream")
+    parser.add_argument(
+        "--challenges", action="store_true",
+        help="also count the solved Challenge20xx plaintexts"
+    )
+    parser.add_argument("--out", default=MODEL_DIR, help="output directory")
+    parser.add_argument(
+        "--prefix", default="custom",
+        help="models are written as PREFIX_<name>.npy; "
+        "'english' replaces the default tables in the model directory"
+    )
+    parser.add_argument(
+        "--orders", type=int, nargs="+", default=[1, 2, 3, 4, 5]
+    )
+    parser.add_argument("--chunk-size", type=int, default=1 << 20)
+    parser.add_argument(
+        "--calibrate", action="store_true",
+        help="print the Calibration of the installed quadgram model on "
+        "the English Challenge20xx plaintexts, the source of "
+        "ENGLISH_QUADGRAM_CALIBRATION"
+    )
+    args = parser.parse_args()
+
+    if args.calibrate:
+        print(calibrate(english_plaintexts()))
+        return
+
+    counter = NgramCounter(orders=tuple(args.orders))
+    for path in args.corpus:
+        counter.update_file(path, chunk_size=args.chunk_size)
+    if args.challenges:
+        for plaintext in challenge_plaintexts():
+            counter.update(plaintext)
+    os.makedirs(args.out, exist_ok=True)
+    for path in counter.save(args.out, prefix=args.prefix):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()